@@ -24,15 +24,37 @@ Key Features:
 """
 
 import os
+import re
+import json
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Tuple, Optional, Iterator
 from pathlib import Path
 
+import numpy as np
+
 # LlamaIndex imports
 from llama_index.core import Settings
 from llama_index.llms.openai import OpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 
+# Helper modules - imported at load time so the first query doesn't pay for it.
+# Left as None if unavailable here; they are imported again on first use.
+# The PII column detector is shared with function_tools, so both modules agree
+# on which columns the database tool has already masked.
+try:
+    from helper_modules.document_tools import DocumentToolsManager
+    from helper_modules.function_tools import FunctionToolsManager, _detect_pii_fields as _detect_pii_columns
+except ImportError:
+    DocumentToolsManager = None
+    FunctionToolsManager = None
+    _detect_pii_columns = None
+
 # Environment setup
 from dotenv import load_dotenv
 load_dotenv()
@@ -41,6 +63,46 @@ load_dotenv()
 logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns used on every database result and routing response
+_COLUMNS_RE = re.compile(r'COLUMNS:\s*(.+)')
+_SQ_RE = re.compile(r"'([^']+)'")
+_DQ_RE = re.compile(r'"([^"]+)"')
+_INT_RE = re.compile(r'\d+')
+
+# Keyword sets for the heuristic routing fallback, matched against query tokens
+# (plural forms included since tokens are compared whole)
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_DB_KW = frozenset({'customer', 'customers', 'portfolio', 'portfolios', 'holding', 'holdings', 'database'})
+_MKT_KW = frozenset({'price', 'prices', 'stock', 'stocks', 'market', 'markets', 'current'})
+_FILING_KW = frozenset({'apple', 'aapl', 'google', 'googl', 'tesla', 'tsla', 'company', 'companies',
+                        'business', 'businesses', 'strategy', 'strategies', 'revenue', 'revenues'})
+_AAPL_KW = frozenset({'apple', 'aapl'})
+_GOOGL_KW = frozenset({'google', 'googl', 'alphabet'})
+_TSLA_KW = frozenset({'tesla', 'tsla'})
+_COMPANY_KW = (('AAPL', _AAPL_KW), ('GOOGL', _GOOGL_KW), ('TSLA', _TSLA_KW))
+
+# Synthesis is always used for questions that ask to relate the results
+_SYNTHESIS_KW = frozenset({'compare', 'comparison', 'vs', 'versus', 'summarize', 'summary', 'analyze', 'analysis'})
+
+# Streamed answers whose synthesis fails midway continue with the fallback answer after this
+_PARTIAL_ANSWER_SEPARATOR = "\n\n---\n\n"
+
+# Static part of the routing prompt that follows the tool list
+_ROUTING_GUIDELINES = """Routing Guidelines:
+- Questions about customers, portfolios, holdings → use database_query_tool
+- Questions about current stock prices, market data → use finance_market_search_tool
+- Questions about company business, strategy, financials from SEC filings → use document tools (AAPL_10k_filing_tool, GOOGL_10k_filing_tool, TSLA_10k_filing_tool)
+- Complex queries may require multiple tools
+
+Select the tool(s) needed to answer this query. Return ONLY a comma-separated list of tool indices (0-based), nothing else.
+For example: "0,3" or "1,2,4" or "5\""""
+
+
+def _query_companies(query: str) -> frozenset:
+    """Return the tickers of the companies a query mentions"""
+    tokens = set(_TOKEN_RE.findall(query.lower()))
+    return frozenset(ticker for ticker, keywords in _COMPANY_KW if keywords & tokens)
+
 
 class AgentCoordinator:
     """
@@ -68,6 +130,9 @@ class AgentCoordinator:
         self.verbose = verbose
         self.project_root = Path.cwd()  # Use current working directory
         
+        # Return small, independent multi-tool results without an LLM synthesis call
+        self.enable_synthesis_skip = True
+        
         # Company metadata
         self.company_info = {
             "AAPL": {"name": "Apple Inc.", "sector": "Technology"},
@@ -86,6 +151,40 @@ class AgentCoordinator:
         # Don't auto-initialize tools - create them lazily when first needed
         self._tools_initialized = False
         
+        # Routing data derived from the tools, rebuilt by _index_tools()
+        self._tool_objs = None
+        self._tool_meta = []
+        self._doc_tool_count = 0
+        self._tools_sig = None
+        self._tool_names = []
+        self._tool_names_lower = {}
+        self._needs_pii_check = frozenset()
+        self._pii_tool = None
+        self._tool_descriptions_block = None
+        self._routing_prompt_prefix = None
+        
+        # Memoized LLM routing decisions keyed by (normalized query, tool set hash)
+        self._route_llm = lru_cache(maxsize=1024)(self._select_tool_indices)
+        
+        # Semantic routing cache: (unit query embedding, tool indices) pairs, FIFO-evicted.
+        # Paraphrased questions whose cosine similarity reaches the threshold reuse
+        # the cached routing instead of calling the LLM.
+        self.semantic_route_threshold = 0.92
+        self._route_cache = deque(maxlen=512)
+        self._route_cache_sig = None
+        self._route_cache_matrix = None
+        self._route_cache_lock = threading.Lock()
+        self._embed_query = lru_cache(maxsize=1024)(self._embed_text)
+        # After an embedding failure the cache is skipped for a while, so an
+        # outage costs one failed lookup instead of one per query
+        self._route_embed_backoff = 60.0
+        self._route_embed_retry_at = 0.0
+        
+        # LRU cache of document tool answers keyed by (tool name, normalized query hash)
+        self._doc_result_cache = OrderedDict()
+        self._doc_result_cache_size = 1024
+        self._doc_result_cache_lock = threading.Lock()
+        
         if self.verbose:
             print("✅ Financial Agent Coordinator Initialized")
             print(f"   Companies: {self.companies}")
@@ -126,6 +225,15 @@ class AgentCoordinator:
         # Set global LlamaIndex settings
         Settings.llm = self.llm
         Settings.embed_model = embed_model
+        
+        # Separate fail-fast client for the semantic routing cache: a cache
+        # lookup sits in front of every routing call, so it must not retry
+        self._route_embed_model = OpenAIEmbedding(
+            model="text-embedding-ada-002",
+            api_base=api_base,
+            max_retries=0,
+            timeout=5.0
+        )
     
     
     def setup(self, document_tools: List = None, function_tools: List = None):
@@ -147,6 +255,7 @@ class AgentCoordinator:
                 # Use provided tools
                 self.document_tools = document_tools
                 self.function_tools = function_tools
+                self._index_tools()
             else:
                 # Create tools automatically
                 self._create_tools()
@@ -157,7 +266,7 @@ class AgentCoordinator:
                 print(f"🎯 System ready: {'✅' if status['ready'] else '❌'}")
                 
         except Exception as e:
-            logger.error(f"Setup failed: {e}")
+            logger.error("Setup failed: %s", e)
             if self.verbose:
                 print(f"❌ Setup failed: {e}")
     
@@ -165,14 +274,17 @@ class AgentCoordinator:
         """Create all tools automatically using helper modules
         
         Steps:
-        1. Import DocumentToolsManager from .document_tools
-        2. Import FunctionToolsManager from .function_tools
+        1. Import DocumentToolsManager from .document_tools (done at module load)
+        2. Import FunctionToolsManager from .function_tools (done at module load)
         3. Create instances and call their build methods
         4. Store results in self.document_tools and self.function_tools
         """
-        # Import helper modules
-        from helper_modules.document_tools import DocumentToolsManager
-        from helper_modules.function_tools import FunctionToolsManager
+        global DocumentToolsManager, FunctionToolsManager
+        
+        # Helper modules are normally imported with this module
+        if DocumentToolsManager is None or FunctionToolsManager is None:
+            from helper_modules.document_tools import DocumentToolsManager
+            from helper_modules.function_tools import FunctionToolsManager
         
         # Create DocumentToolsManager and build document tools
         doc_manager = DocumentToolsManager(companies=self.companies, verbose=self.verbose)
@@ -182,6 +294,8 @@ class AgentCoordinator:
         func_manager = FunctionToolsManager(verbose=self.verbose)
         self.function_tools = func_manager.create_function_tools()
         
+        self._index_tools()
+        
         if self.verbose:
             print(f"   Created {len(self.document_tools)} document tools")
             print(f"   Created {len(self.function_tools)} function tools")
@@ -208,25 +322,27 @@ class AgentCoordinator:
         if "COLUMNS:" not in result:
             return result
         
-        # Extract column names from result
-        import re
-        import ast
+        # The database tool masks PII itself and marks the result
+        if "[PII Protection Applied]" in result:
+            return result
         
         # Find COLUMNS line
-        columns_match = re.search(r'COLUMNS:\s*(.+)', result)
+        columns_match = _COLUMNS_RE.search(result)
         if not columns_match:
             return result
         
         columns_str = columns_match.group(1).strip()
         
-        # Parse column names
+        # Parse column names - the database tool emits them as a JSON list
         try:
-            cols = ast.literal_eval(columns_str)
-        except:
-            # Fallback: regex extraction
-            cols = re.findall(r"'([^']+)'", columns_str)
+            cols = json.loads(columns_str)
+            if not isinstance(cols, list):
+                raise ValueError("COLUMNS is not a list")
+        except ValueError:
+            # Fallback: regex extraction (e.g. a "['a', 'b']" list repr)
+            cols = _SQ_RE.findall(columns_str)
             if not cols:
-                cols = re.findall(r'"([^"]+)"', columns_str)
+                cols = _DQ_RE.findall(columns_str)
         
         if not cols:
             return result
@@ -236,20 +352,16 @@ class AgentCoordinator:
         
         # If PII detected, find and use the pii_protection_tool
         if pii_fields:
-            # Find PII protection tool
-            pii_tool = None
-            for tool in self.function_tools:
-                if hasattr(tool, 'metadata') and 'pii' in tool.metadata.name.lower():
-                    pii_tool = tool
-                    break
+            # PII protection tool resolved once in _index_tools()
+            pii_tool = self._pii_tool
             
             if pii_tool:
                 # Apply protection
                 try:
-                    protected_result = pii_tool.call(database_results=result, column_names=str(cols))
+                    protected_result = str(pii_tool.call(database_results=result, column_names=json.dumps(cols)))
                     return protected_result
                 except Exception as e:
-                    logger.error(f"PII protection error: {e}")
+                    logger.error("PII protection error: %s", e)
                     return result
         
         return result
@@ -265,38 +377,251 @@ class AgentCoordinator:
         Returns:
             Set of field names that contain PII
         """
-        # Define PII field patterns (email, phone, names, address, ssn, etc.)
-        pii_patterns = {
-            # Email patterns
-            'email', 'email_address', 'e_mail', 'e-mail', 'email_addr',
-            # Phone patterns
-            'phone', 'phone_number', 'telephone', 'mobile', 'cell', 'contact_number',
-            # Name patterns
-            'first_name', 'last_name', 'full_name', 'customer_name', 'name', 'given_name', 'surname',
-            # Address patterns
-            'address', 'street_address', 'mailing_address', 'home_address', 'physical_address',
-            # SSN patterns
-            'ssn', 'social_security_number', 'tax_id', 'tax_id_number', 'ssn_number'
-        }
+        global _detect_pii_columns
+        
+        # Helper modules are normally imported with this module
+        if _detect_pii_columns is None:
+            from helper_modules.function_tools import _detect_pii_fields as _detect_pii_columns
         
-        detected_pii = set()
+        return _detect_pii_columns(field_names)
+    
+    def _index_tools(self):
+        """Precompute routing data for the current tools
+        
+        The tool list is immutable after setup, so the tool table and the whole
+        routing prompt up to the user query are built once. Keeping the prefix
+        byte-identical across calls also lets provider-side prompt caches hit.
+        """
+        # Snapshot tool objects and their metadata once - .metadata is a property
+        # on LlamaIndex tools, so routing only works from these lists
+        self._tool_objs = list(self.document_tools) + list(self.function_tools)
+        self._doc_tool_count = len(self.document_tools)
+        self._tool_meta = [(tool.metadata.name, tool.metadata.description) for tool in self._tool_objs]
         
-        # Check each field name against patterns (case-insensitive)
-        for field_name in field_names:
-            field_lower = str(field_name).lower().strip()
+        self._tools_sig = hashlib.sha1("|".join(name for name, _ in self._tool_meta).encode()).hexdigest()
+        
+        self._tool_names = [name for name, _ in self._tool_meta]
+        
+        # Only database results can carry PII; resolve the PII tool once
+        function_meta = self._tool_meta[self._doc_tool_count:]
+        self._needs_pii_check = frozenset(name for name, _ in function_meta if 'database' in name.lower())
+        self._pii_tool = next((self._tool_objs[self._doc_tool_count + i]
+                               for i, (name, _) in enumerate(function_meta) if 'pii' in name.lower()), None)
+        
+        # Lowercased tool names by index for the keyword fallback
+        self._tool_names_lower = {name.lower(): idx for idx, (name, _) in enumerate(self._tool_meta)}
+        
+        self._tool_descriptions_block = "\n".join(f"{i}. {tool_name}: {tool_desc}"
+                                                  for i, (tool_name, tool_desc) in enumerate(self._tool_meta))
+        self._routing_prompt_prefix = (
+            "You are a financial agent coordinator. Analyze the user query and select "
+            "the appropriate tools to answer it.\n\n"
+            f"Available Tools:\n{self._tool_descriptions_block}\n\n"
+            f"{_ROUTING_GUIDELINES}"
+        )
+        
+        # Tools changed - cached routing decisions are stale
+        self._route_llm.cache_clear()
+        with self._doc_result_cache_lock:
+            self._doc_result_cache.clear()
+        with self._route_cache_lock:
+            self._route_cache.clear()
+            self._route_cache_matrix = None
+    
+    def _select_tool_indices(self, query_sig: str, tools_sig: str) -> Tuple[int, ...]:
+        """Ask the LLM which tools should answer the query
+        
+        Routing is deterministic (temperature=0) and depends only on the
+        normalized query and the tool set, so results are memoized through
+        `self._route_llm`; `tools_sig` is part of the cache key only.
+        
+        Args:
+            query_sig: Normalized (stripped, lowercased) user query
+            tools_sig: Hash of the available tool names
             
-            # Direct match
-            if field_lower in pii_patterns:
-                detected_pii.add(field_name)
-                continue
+        Returns:
+            Tuple of valid tool indices selected by the LLM (may be empty)
+        """
+        # Append the query to the prebuilt prompt prefix
+        prompt = self._routing_prompt_prefix + f"\n\nUser Query: {query_sig}\n\nSelected tools:"
+        
+        # Use LLM to select tools
+        response = self.llm.complete(prompt)
+        selected_indices_str = str(response.text).strip()
+        
+        # Parse LLM response to get tool indices - the prompt asks for "0,3" format
+        tokens = selected_indices_str.strip('"').replace(' ', '').split(',')
+        if all(token.isdigit() for token in tokens):
+            indices = [int(token) for token in tokens]
+        else:
+            # Fallback: extract any numbers from a free-form response
+            indices = [int(x) for x in _INT_RE.findall(selected_indices_str)]
+        
+        # Filter valid indices
+        return tuple(idx for idx in indices if 0 <= idx < len(self._tool_meta))
+    
+    def _embed_text(self, text: str) -> np.ndarray:
+        """Embed text for the semantic routing cache
+        
+        Wrapped with lru_cache as `self._embed_query`, so identical strings are
+        only embedded once.
+        
+        Args:
+            text: Normalized query text
+            
+        Returns:
+            Read-only unit-length embedding vector
+        """
+        vector = np.asarray(self._route_embed_model.get_text_embedding(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        vector.setflags(write=False)
+        return vector
+    
+    def _lookup_semantic_route(self, query_embedding: np.ndarray, tools_sig: str,
+                               companies: frozenset) -> Optional[Tuple[int, ...]]:
+        """Find cached tool indices for a semantically similar query
+        
+        Args:
+            query_embedding: Unit-length embedding of the normalized query
+            tools_sig: Hash of the available tool names
+            companies: Tickers mentioned by the query
+            
+        Returns:
+            Cached tool indices if the best match reaches the similarity
+            threshold and mentions the same companies, otherwise None
+        """
+        with self._route_cache_lock:
+            if not self._route_cache or self._route_cache_sig != tools_sig:
+                return None
+            
+            # Brute-force cosine similarity against all cached (unit) vectors
+            if self._route_cache_matrix is None:
+                self._route_cache_matrix = np.vstack([vector for vector, _, _ in self._route_cache])
+            scores = self._route_cache_matrix @ query_embedding
+            best = int(np.argmax(scores))
             
-            # Pattern matching - check if any PII pattern is in the field name
-            for pattern in pii_patterns:
-                if pattern in field_lower:
-                    detected_pii.add(field_name)
-                    break
+            # Embeddings of "Apple revenue" and "Tesla revenue" are close, but
+            # they must not share a route to a company-specific tool
+            _, cached_companies, indices = self._route_cache[best]
+            if scores[best] >= self.semantic_route_threshold and cached_companies == companies:
+                return indices
         
-        return detected_pii
+        return None
+    
+    def _store_semantic_route(self, query_embedding: np.ndarray, tools_sig: str,
+                              companies: frozenset, indices: Tuple[int, ...]):
+        """Remember the routing decision for a query embedding
+        
+        Args:
+            query_embedding: Unit-length embedding of the normalized query
+            tools_sig: Hash of the available tool names
+            companies: Tickers mentioned by the query
+            indices: Tool indices selected for the query
+        """
+        with self._route_cache_lock:
+            if self._route_cache_sig != tools_sig:
+                self._route_cache.clear()
+                self._route_cache_sig = tools_sig
+            self._route_cache.append((query_embedding, companies, indices))
+            self._route_cache_matrix = None
+    
+    def _heuristic_tool_indices(self, query: str) -> List[int]:
+        """Select tools with simple keyword matching when the LLM gives no usable answer
+        
+        Args:
+            query: User's natural language query
+            
+        Returns:
+            List of tool indices matching the query keywords
+        """
+        valid_indices = []
+        query_tokens = set(_TOKEN_RE.findall(query.lower()))
+        for name_lower, idx in self._tool_names_lower.items():
+            # Simple keyword matching
+            if 'database' in name_lower and _DB_KW & query_tokens:
+                valid_indices.append(idx)
+            elif 'market' in name_lower and _MKT_KW & query_tokens:
+                valid_indices.append(idx)
+            elif '10k' in name_lower or 'filing' in name_lower:
+                if _FILING_KW & query_tokens:
+                    # Check if query mentions specific company
+                    if 'aapl' in name_lower and _AAPL_KW & query_tokens:
+                        valid_indices.append(idx)
+                    elif 'googl' in name_lower and _GOOGL_KW & query_tokens:
+                        valid_indices.append(idx)
+                    elif 'tsla' in name_lower and _TSLA_KW & query_tokens:
+                        valid_indices.append(idx)
+        return valid_indices
+    
+    def _select_tools(self, query: str) -> List[int]:
+        """Decide which tools should answer the query
+        
+        Tries the semantic routing cache first, then the (memoized) LLM router,
+        and finally keyword heuristics.
+        
+        Args:
+            query: User's natural language query
+            
+        Returns:
+            Sorted list of unique tool indices
+        """
+        if self._tool_objs is None:
+            self._index_tools()
+        tools_sig = self._tools_sig
+        query_sig = query.strip().lower()
+        
+        # Reuse the routing of a semantically similar earlier query if possible
+        query_embedding = None
+        cached_indices = None
+        companies = _query_companies(query_sig)
+        if time.monotonic() >= self._route_embed_retry_at:
+            try:
+                query_embedding = self._embed_query(query_sig)
+                cached_indices = self._lookup_semantic_route(query_embedding, tools_sig, companies)
+            except Exception as e:
+                self._route_embed_retry_at = time.monotonic() + self._route_embed_backoff
+                logger.warning("Semantic routing cache unavailable, skipping it for %.0fs: %s",
+                               self._route_embed_backoff, e)
+        
+        if cached_indices is not None:
+            valid_indices = list(cached_indices)
+        else:
+            # Use LLM to select tools (memoized per normalized query and tool set)
+            valid_indices = list(self._route_llm(query_sig, tools_sig))
+            if valid_indices and query_embedding is not None:
+                self._store_semantic_route(query_embedding, tools_sig, companies, tuple(valid_indices))
+        
+        # If no valid indices, use simple heuristics as fallback
+        if not valid_indices:
+            valid_indices = self._heuristic_tool_indices(query)
+        
+        # Remove duplicates and sort
+        return sorted(set(valid_indices))
+    
+    def _selected_tool_entries(self, indices: List[int]) -> List[Tuple[str, str, Any, str]]:
+        """Map tool indices to executable tool entries
+        
+        The PII tool is applied automatically to database results, so it is
+        never executed directly.
+        
+        Args:
+            indices: Tool indices chosen by routing
+            
+        Returns:
+            List of tuples: (tool_name, tool_description, tool, tool_type)
+        """
+        entries = []
+        for idx in indices:
+            if idx >= len(self._tool_meta):
+                continue
+            tool_name, tool_desc = self._tool_meta[idx]
+            if 'pii' in tool_name.lower():
+                continue
+            tool_type = 'document' if idx < self._doc_tool_count else 'function'
+            entries.append((tool_name, tool_desc, self._tool_objs[idx], tool_type))
+        return entries
     
     def _route_query(self, query: str) -> List[Tuple[str, str, Any]]:
         """Use LLM to intelligently route query to appropriate tools
@@ -310,117 +635,171 @@ class AgentCoordinator:
         Returns:
             List of tuples: (tool_name, tool_description, result)
         """
-        # Create descriptions of all available tools
-        all_tools = []
-        tool_descriptions = []
-        
-        # Add document tools
-        for i, tool in enumerate(self.document_tools):
-            tool_name = tool.metadata.name
-            tool_desc = tool.metadata.description
-            all_tools.append((tool_name, tool_desc, tool, 'document'))
-            tool_descriptions.append(f"{i}. {tool_name}: {tool_desc}")
-        
-        # Add function tools
-        offset = len(self.document_tools)
-        for i, tool in enumerate(self.function_tools):
-            tool_name = tool.metadata.name
-            tool_desc = tool.metadata.description
-            all_tools.append((tool_name, tool_desc, tool, 'function'))
-            tool_descriptions.append(f"{offset + i}. {tool_name}: {tool_desc}")
-        
-        # Build LLM prompt with query and tool options
-        prompt = f"""You are a financial agent coordinator. Analyze the user query and select the appropriate tools to answer it.
-
-User Query: {query}
-
-Available Tools:
-{chr(10).join(tool_descriptions)}
-
-Routing Guidelines:
-- Questions about customers, portfolios, holdings → use database_query_tool
-- Questions about current stock prices, market data → use finance_market_search_tool
-- Questions about company business, strategy, financials from SEC filings → use document tools (AAPL_10k_filing_tool, GOOGL_10k_filing_tool, TSLA_10k_filing_tool)
-- Complex queries may require multiple tools
-
-Select the tool(s) needed to answer this query. Return ONLY a comma-separated list of tool indices (0-based), nothing else.
-For example: "0,3" or "1,2,4" or "5"
-
-Selected tools:"""
-        
         try:
-            # Use LLM to select tools
-            response = self.llm.complete(prompt)
-            selected_indices_str = str(response.text).strip()
-            
-            # Parse LLM response to get tool indices
-            import re
-            # Extract numbers from response
-            indices = [int(x) for x in re.findall(r'\d+', selected_indices_str)]
+            valid_indices = self._select_tools(query)
             
-            # Filter valid indices
-            valid_indices = [idx for idx in indices if 0 <= idx < len(all_tools)]
+            # Execute selected tools concurrently - every tool is I/O bound
+            # (LLM, HTTP or SQLite), so wall time becomes ~max(latency)
+            return self._execute_tools(self._selected_tool_entries(valid_indices), query)
             
-            # If no valid indices, use simple heuristics as fallback
-            if not valid_indices:
-                query_lower = query.lower()
-                for idx, (tool_name, tool_desc, tool, tool_type) in enumerate(all_tools):
-                    # Simple keyword matching
-                    if 'database' in tool_name.lower() and any(kw in query_lower for kw in ['customer', 'portfolio', 'holding', 'database']):
-                        valid_indices.append(idx)
-                    elif 'market' in tool_name.lower() and any(kw in query_lower for kw in ['price', 'stock', 'market', 'current']):
-                        valid_indices.append(idx)
-                    elif '10k' in tool_name.lower() or 'filing' in tool_name.lower():
-                        if any(kw in query_lower for kw in ['apple', 'aapl', 'google', 'googl', 'tesla', 'tsla', 'company', 'business', 'strategy', 'revenue']):
-                            # Check if query mentions specific company
-                            if 'aapl' in tool_name.lower() and ('apple' in query_lower or 'aapl' in query_lower):
-                                valid_indices.append(idx)
-                            elif 'googl' in tool_name.lower() and ('google' in query_lower or 'googl' in query_lower or 'alphabet' in query_lower):
-                                valid_indices.append(idx)
-                            elif 'tsla' in tool_name.lower() and ('tesla' in query_lower or 'tsla' in query_lower):
-                                valid_indices.append(idx)
+        except Exception as e:
+            logger.error("Routing error: %s", e)
+            return []
+    
+    def _route_batch(self, questions: List[str]) -> List[Optional[List[int]]]:
+        """Route several questions with a single LLM call
+        
+        All questions share one copy of the routing prompt prefix, amortizing
+        its cost and the request overhead across the batch.
+        
+        Args:
+            questions: User questions to route together
             
-            # Remove duplicates and sort
-            valid_indices = sorted(list(set(valid_indices)))
+        Returns:
+            Sorted tool indices per question, or None for questions whose
+            routing could not be parsed (these fall back to per-query routing)
+        """
+        if self._tool_objs is None:
+            self._index_tools()
+        
+        numbered = "\n".join(f"[{i}] {question}" for i, question in enumerate(questions))
+        prompt = (
+            self._routing_prompt_prefix
+            + f"\n\nQueries:\n{numbered}\n\n"
+            + "Instead of a single list, return ONLY a JSON object mapping each query number "
+            + 'to its list of tool indices, for example: {"0": [0, 3], "1": [4]}'
+            + "\n\nSelected tools:"
+        )
+        
+        try:
+            response = self.llm.complete(prompt)
+            text = str(response.text)
+            routing = json.loads(text[text.index('{'):text.rindex('}') + 1])
+        except Exception as e:
+            logger.error("Batch routing error: %s", e)
+            return [None] * len(questions)
+        
+        routed = []
+        for i in range(len(questions)):
+            indices = routing.get(str(i)) if isinstance(routing, dict) else None
+            if not isinstance(indices, list):
+                routed.append(None)
+                continue
+            # bool is an int subclass; a JSON true must not route to tool 1
+            valid_indices = [idx for idx in indices
+                             if isinstance(idx, int) and not isinstance(idx, bool)
+                             and 0 <= idx < len(self._tool_meta)]
+            routed.append(sorted(set(valid_indices)) if valid_indices else None)
+        return routed
+    
+    def _execute_tool(self, tool_entry: Tuple[str, str, Any, str], query: str) -> Tuple[str, str, str]:
+        """Execute a single selected tool and return its protected result
+        
+        Kept free of shared state so several tools can run in parallel threads.
+        
+        Args:
+            tool_entry: Tuple of (tool_name, tool_description, tool, tool_type)
+            query: User's natural language query
             
-            # Execute selected tools and collect results
-            results = []
-            for idx in valid_indices:
-                if idx < len(all_tools):
-                    tool_name, tool_desc, tool, tool_type = all_tools[idx]
-                    
-                    try:
-                        # Execute tool based on type
-                        if tool_type == 'document':
-                            # Document tool - use query_engine
-                            result = tool.query_engine.query(query)
-                            result_str = str(result)
-                        else:
-                            # Function tool - use call method
-                            if 'database' in tool_name.lower():
-                                result_str = tool.call(query)
-                            elif 'market' in tool_name.lower():
-                                result_str = tool.call(query)
-                            elif 'pii' in tool_name.lower():
-                                # PII tool shouldn't be called directly here
-                                continue
-                            else:
-                                result_str = tool.call(query)
-                        
-                        # Apply PII protection to database results
-                        result_str = self._check_and_apply_pii_protection(tool_name, result_str)
-                        
-                        results.append((tool_name, tool_desc, result_str))
-                        
-                    except Exception as e:
-                        logger.error(f"Error executing tool {tool_name}: {e}")
-                        results.append((tool_name, tool_desc, f"Error: {e}"))
+        Returns:
+            Tuple of (tool_name, tool_description, result_str); result_str is always a str
+        """
+        tool_name, tool_desc, tool, tool_type = tool_entry
+        
+        if tool_type == 'document':
+            # Document tool - use query_engine (answers are cached per tool and query)
+            result_str = self._query_document_tool(tool_name, tool, query)
+        else:
+            # Function tool - call() returns a ToolOutput; convert once so every
+            # later step (PII check, synthesis) works on the plain string
+            result_str = str(tool.call(query))
+        
+        # Apply PII protection to database results
+        if tool_name in self._needs_pii_check:
+            result_str = self._check_and_apply_pii_protection(tool_name, result_str)
+        
+        return tool_name, tool_desc, result_str
+    
+    def _query_document_tool(self, tool_name: str, tool: Any, query: str) -> str:
+        """Query a document tool, reusing earlier answers for the same question
+        
+        Each query runs embedding, vector search and LLM synthesis over a 10-K
+        index, so identical questions are served from an LRU cache.
+        
+        Args:
+            tool_name: Name of the document tool
+            tool: QueryEngineTool to query on a cache miss
+            query: User's natural language query
             
-            return results
+        Returns:
+            Document tool answer as a string
+        """
+        key = (tool_name, hashlib.sha256(query.strip().lower().encode()).digest())
+        
+        with self._doc_result_cache_lock:
+            if key in self._doc_result_cache:
+                self._doc_result_cache.move_to_end(key)
+                return self._doc_result_cache[key]
+        
+        result_str = str(tool.query_engine.query(query))
+        
+        with self._doc_result_cache_lock:
+            self._doc_result_cache[key] = result_str
+            self._doc_result_cache.move_to_end(key)
+            while len(self._doc_result_cache) > self._doc_result_cache_size:
+                self._doc_result_cache.popitem(last=False)
+        
+        return result_str
+    
+    def _execute_tools(self, selected: List[Tuple[str, str, Any, str]], query: str) -> List[Tuple[str, str, str]]:
+        """Execute the selected tools, in parallel when allowed
+        
+        The number of worker threads is capped by the TOOL_CONCURRENCY_LIMIT
+        environment variable (default 4); a limit of 1 runs tools sequentially.
+        
+        Args:
+            selected: Tool entries to execute, in routing order
+            query: User's natural language query
             
-        except Exception as e:
-            logger.error(f"Routing error: {e}")
+        Returns:
+            List of tuples (tool_name, tool_description, result) in the same
+            order as `selected`, so synthesis stays deterministic
+        """
+        if not selected:
             return []
+        
+        try:
+            limit = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "4"))
+        except ValueError:
+            limit = 4
+        max_workers = max(1, min(limit, len(selected)))
+        
+        results = [None] * len(selected)
+        
+        if max_workers == 1:
+            for position, entry in enumerate(selected):
+                try:
+                    results[position] = self._execute_tool(entry, query)
+                except Exception as e:
+                    logger.error("Error executing tool %s: %s", entry[0], e)
+                    results[position] = (entry[0], entry[1], f"Error: {e}")
+            return results
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._execute_tool, entry, query): position
+                for position, entry in enumerate(selected)
+            }
+            for future in as_completed(futures):
+                position = futures[future]
+                tool_name, tool_desc = selected[position][:2]
+                try:
+                    results[position] = future.result()
+                except Exception as e:
+                    logger.error("Error executing tool %s: %s", tool_name, e)
+                    results[position] = (tool_name, tool_desc, f"Error: {e}")
+        
+        return results
     
     def query(self, question: str, verbose: bool = None) -> str:
         """Process query with dynamic tool routing and result synthesis
@@ -438,11 +817,46 @@ Selected tools:"""
         Returns:
             Comprehensive answer synthesized from relevant tools
         """
+        # Use instance verbose if parameter not provided
+        if verbose is None:
+            verbose = self.verbose
+        
+        tool_results = self._route_question(question, verbose)
+        return self._synthesize_results(question, tool_results, verbose)
+    
+    def query_stream(self, question: str, verbose: bool = None) -> Iterator[str]:
+        """Process query like query(), yielding the answer as it is generated
+        
+        Synthesized answers are streamed token by token from the LLM, so callers
+        can show output before the whole answer is ready. Answers that need no
+        synthesis are yielded in one piece. If synthesis fails midway, the
+        plain fallback answer follows what was already sent.
+        
+        Args:
+            question: User's financial question
+            verbose: Whether to show detailed processing info
+            
+        Yields:
+            Successive chunks of the answer
+        """
         
         # Use instance verbose if parameter not provided
         if verbose is None:
             verbose = self.verbose
         
+        tool_results = self._route_question(question, verbose)
+        yield from self._stream_results(question, tool_results, verbose)
+    
+    def _route_question(self, question: str, verbose: bool) -> List[Tuple[str, str, Any]]:
+        """Initialize tools if needed and run the tools selected for a question
+        
+        Args:
+            question: User's financial question
+            verbose: Whether to show detailed processing info
+            
+        Returns:
+            List of tuples (tool_name, tool_description, result)
+        """
         # Ensure tools are initialized
         if not self._tools_initialized:
             self.setup()
@@ -452,10 +866,81 @@ Selected tools:"""
             print(f"🎯 Query: {question}")
         
         # Route query to appropriate tools using _route_query()
-        tool_results = self._route_query(question)
+        return self._route_query(question)
+    
+    def query_batch(self, questions: List[str], batch_size: int = 8) -> List[str]:
+        """Answer several questions, routing each chunk with a single LLM call
+        
+        Useful for evaluation loops and backfills. Tool execution and synthesis
+        still happen per question; questions whose batched routing cannot be
+        parsed fall back to regular per-query routing.
+        
+        Args:
+            questions: User financial questions
+            batch_size: Questions routed per LLM call (capped at 16, beyond
+                which batched answers become unreliable)
+            
+        Returns:
+            List of answers in the same order as `questions`
+        """
+        # Ensure tools are initialized
+        if not self._tools_initialized:
+            self.setup()
+            self._tools_initialized = True
+        
+        batch_size = max(1, min(batch_size, 16))
+        answers = []
+        
+        for start in range(0, len(questions), batch_size):
+            chunk = questions[start:start + batch_size]
+            routed = self._route_batch(chunk) if len(chunk) > 1 else [None]
+            
+            for question, indices in zip(chunk, routed):
+                if indices is None:
+                    tool_results = self._route_query(question)
+                else:
+                    tool_results = self._execute_tools(self._selected_tool_entries(indices), question)
+                answers.append(self._synthesize_results(question, tool_results, verbose=False))
+        
+        return answers
+    
+    def _synthesize_results(self, question: str, tool_results: List[Tuple[str, str, Any]], verbose: bool = False) -> str:
+        """Combine tool results into a final answer
+        
+        Args:
+            question: User's financial question
+            tool_results: List of tuples (tool_name, tool_description, result)
+            verbose: Whether to show detailed processing info
+            
+        Returns:
+            Answer built from the tool results, or the plain fallback answer
+            if synthesis fails
+        """
+        try:
+            return "".join(self._stream_results(question, tool_results, verbose, recover=False))
+        except Exception as e:
+            logger.error("Synthesis error: %s", e)
+            # Fallback: return concatenated results
+            return self._format_fallback_answer(question, tool_results)
+    
+    def _stream_results(self, question: str, tool_results: List[Tuple[str, str, Any]], verbose: bool = False,
+                        recover: bool = True) -> Iterator[str]:
+        """Combine tool results into a final answer, streaming LLM synthesis
         
+        Args:
+            question: User's financial question
+            tool_results: List of tuples (tool_name, tool_description, result)
+            verbose: Whether to show detailed processing info
+            recover: Whether a synthesis error yields the fallback answer
+                (after a separator if part of the answer was sent) instead
+                of propagating
+            
+        Yields:
+            Successive chunks of the answer
+        """
         if not tool_results:
-            return "Unable to process query. No appropriate tools found or error occurred."
+            yield "Unable to process query. No appropriate tools found or error occurred."
+            return
         
         # Display tool selection info if verbose
         if verbose:
@@ -463,39 +948,90 @@ Selected tools:"""
             for tool_name, tool_desc, _ in tool_results:
                 print(f"      - {tool_name}")
         
-        # If single tool result, return it directly
+        # If single tool result, return it directly (already a string)
         if len(tool_results) == 1:
             _, _, result = tool_results[0]
-            return str(result)
+            yield result
+            return
+        
+        # Small results from at most two tools that the question doesn't ask
+        # to relate are returned as-is, saving the synthesis LLM round-trip
+        if self.enable_synthesis_skip and self._can_skip_synthesis(question, tool_results):
+            yield self._format_fallback_answer(question, tool_results)
+            return
         
         # If multiple tool results, synthesize using LLM
         # Build synthesis prompt
-        synthesis_prompt = f"""You are a financial analyst assistant. Synthesize the following information from multiple sources into a comprehensive, coherent answer.
+        parts = [f"""You are a financial analyst assistant. Synthesize the following information from multiple sources into a comprehensive, coherent answer.
 
 Original Query: {question}
 
 Information from Tools:
-"""
+"""]
         
         for i, (tool_name, tool_desc, result) in enumerate(tool_results, 1):
-            synthesis_prompt += f"\n{i}. {tool_name} ({tool_desc}):\n{result}\n"
+            parts.append(f"\n{i}. {tool_name} ({tool_desc}):\n{result}\n")
         
-        synthesis_prompt += "\n\nProvide a comprehensive answer that integrates all the information above. Be clear, concise, and ensure all relevant details are included."
+        parts.append("\n\nProvide a comprehensive answer that integrates all the information above. Be clear, concise, and ensure all relevant details are included.")
+        synthesis_prompt = "".join(parts)
         
+        started = False
         try:
-            # Use LLM to synthesize results
-            synthesis_response = self.llm.complete(synthesis_prompt)
-            synthesized_answer = str(synthesis_response.text).strip()
-            
-            return synthesized_answer
+            # Use LLM to synthesize results, stripping leading and trailing
+            # whitespace of the whole answer as it streams
+            pending = ""
+            for chunk in self.llm.stream_complete(synthesis_prompt):
+                delta = chunk.delta or ""
+                if not started:
+                    delta = delta.lstrip()
+                content = delta.rstrip()
+                if content:
+                    yield pending + content
+                    started = True
+                    pending = delta[len(content):]
+                elif started:
+                    pending += delta
             
         except Exception as e:
-            logger.error(f"Synthesis error: {e}")
-            # Fallback: return concatenated results
-            fallback_answer = f"Query: {question}\n\n"
-            for tool_name, _, result in tool_results:
-                fallback_answer += f"From {tool_name}:\n{result}\n\n"
-            return fallback_answer
+            if not recover:
+                raise
+            logger.error("Synthesis error: %s", e)
+            # Fallback: return concatenated results, after whatever part of
+            # the synthesized answer was already sent
+            if started:
+                yield _PARTIAL_ANSWER_SEPARATOR
+            yield self._format_fallback_answer(question, tool_results)
+    
+    def _can_skip_synthesis(self, question: str, tool_results: List[Tuple[str, str, Any]]) -> bool:
+        """Check whether tool results can be returned without LLM synthesis
+        
+        Args:
+            question: User's financial question
+            tool_results: List of tuples (tool_name, tool_description, result)
+            
+        Returns:
+            True for at most two results totalling under 1200 characters when
+            the question doesn't ask to compare, summarize or analyze them
+        """
+        if len(tool_results) > 2:
+            return False
+        if sum(len(str(result)) for _, _, result in tool_results) >= 1200:
+            return False
+        return not (_SYNTHESIS_KW & set(_TOKEN_RE.findall(question.lower())))
+    
+    def _format_fallback_answer(self, question: str, tool_results: List[Tuple[str, str, Any]]) -> str:
+        """Concatenate tool results into a plain answer
+        
+        Args:
+            question: User's financial question
+            tool_results: List of tuples (tool_name, tool_description, result)
+            
+        Returns:
+            Answer listing each tool's result
+        """
+        parts = [f"Query: {question}\n\n"]
+        parts.extend(f"From {tool_name}:\n{result}\n\n" for tool_name, _, result in tool_results)
+        return "".join(parts)
     
     def get_available_tools(self) -> Dict[str, Any]:
         """
@@ -549,26 +1085,7 @@ Information from Tools:
         Returns:
             List of tool names
         """
-        if not self._tools_initialized:
-            self._create_tools()
-
-        tool_names = []
-
-        # Add document tool names
-        for tool in self.document_tools:
-            if hasattr(tool, 'metadata') and hasattr(tool.metadata, 'name'):
-                tool_names.append(tool.metadata.name)
-            elif hasattr(tool, '_name'):
-                tool_names.append(tool._name)
-
-        # Add function tool names
-        for tool in self.function_tools:
-            if hasattr(tool, 'metadata') and hasattr(tool.metadata, 'name'):
-                tool_names.append(tool.metadata.name)
-            elif hasattr(tool, '_name'):
-                tool_names.append(tool._name)
-
-        return tool_names
+        return list(self._tool_names)
 
     def _intelligent_routing(self, query: str) -> List[Tuple[str, str, Any]]:
         """
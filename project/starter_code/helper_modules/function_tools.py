@@ -23,14 +23,20 @@ Key Concepts:
 """
 
 import os
+import asyncio
+import concurrent.futures
 import logging
 import sqlite3
 import random
 import re
 import json
-import requests
+import threading
+import time
+import httpx
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, List, Optional, Tuple
 
 # LlamaIndex imports
 from llama_index.core import Settings
@@ -38,6 +44,20 @@ from llama_index.core.tools import FunctionTool
 from llama_index.llms.openai import OpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 
+# Faster JSON encoding/decoding for tool inputs, outputs and API responses
+# when orjson is installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _dumps(value) -> str:
+        return orjson.dumps(value, default=str).decode()
+except ImportError:
+    _json_loads = json.loads
+    
+    def _dumps(value) -> str:
+        return json.dumps(value, default=str)
+
 # Environment setup
 from dotenv import load_dotenv
 load_dotenv()
@@ -45,84 +65,91 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-class FunctionToolsManager:
-    """Manager for all function tools - Database, market data, and PII protection"""
-    
-    def __init__(self, verbose: bool = False):
-        """Initialize function tools manager
-        
-        Args:
-            verbose: Whether to print detailed progress information
-        """
-        self.verbose = verbose
-        self.project_root = Path.cwd()
-        self.db_path = self.project_root / "data" / "financial.db"
-        
-        # Database schema for SQL generation
-        self.db_schema = self._get_database_schema()
-        
-        # Storage for tools
-        self.function_tools = []
-        
-        self._configure_settings()
-        
-        if self.verbose:
-            print("✅ Function Tools Manager Initialized")
-    
-    def _configure_settings(self):
-        """Configure LlamaIndex settings
-        
-        Requirements:
-        - Create OpenAI LLM with "gpt-3.5-turbo" model and temperature=0
-        - Set Settings.llm and Settings.embed_model
-        - Store LLM reference in self.llm for use in tools
-        
-        IMPORTANT NOTE FOR VOCAREUM:
-        LlamaIndex requires the api_base parameter to work with Vocareum's OpenAI endpoint.
-        Get the base URL from environment: os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
-        Pass it as api_base parameter to both OpenAI() and OpenAIEmbedding() constructors.
-        
-        Hint: This is similar to document_tools configuration
-        """
-        # Get API base URL for Vocareum compatibility
-        api_base = os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
-        
-        # Create OpenAI LLM with Vocareum compatibility
-        self.llm = OpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0,
-            api_base=api_base
-        )
-        
-        # Create OpenAI embeddings with Vocareum compatibility
-        embed_model = OpenAIEmbedding(
-            model="text-embedding-ada-002",
-            api_base=api_base
-        )
-        
-        # Set global LlamaIndex settings
-        Settings.llm = self.llm
-        Settings.embed_model = embed_model
-    
-    def _get_database_schema(self) -> str:
-        """Get enhanced database schema with relationships for SQL generation
-        
-        This method reads the database structure and returns a comprehensive
-        schema description that helps the LLM generate better SQL queries.
-        
-        Returns:
-            String containing detailed database schema with table relationships
-        """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get table names to verify database connection
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-            
-            # Return comprehensive schema for SQL generation
-            schema_info = """Enhanced Database Schema with Relationships:
+# Precompiled patterns used by the SQL and PII tools
+_RE_SQL_FENCE = re.compile(r'```sql\s*|```\s*')
+_RE_NON_DIGIT = re.compile(r'[^\d]')
+_RE_SQ = re.compile(r"'([^']+)'")
+_RE_DQ = re.compile(r'"([^"]+)"')
+_RE_READ_ONLY_SQL = re.compile(r'\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+# Column names (and name fragments) treated as personally identifiable
+_PII_PATTERNS = frozenset({
+    # Email patterns
+    'email', 'email_address', 'e_mail', 'e-mail', 'email_addr',
+    # Phone patterns
+    'phone', 'phone_number', 'telephone', 'mobile', 'cell', 'contact_number',
+    # Name patterns
+    'first_name', 'last_name', 'full_name', 'customer_name', 'name', 'given_name', 'surname',
+    # Address patterns
+    'address', 'street_address', 'mailing_address', 'home_address', 'physical_address',
+    # SSN patterns
+    'ssn', 'social_security_number', 'tax_id', 'tax_id_number', 'ssn_number'
+})
+# Matches any PII pattern inside a field name in a single pass
+_PII_RE = re.compile('|'.join(map(re.escape, sorted(_PII_PATTERNS, key=len, reverse=True))))
+# Marker appended to results whose PII fields have been masked
+_PII_NOTICE = "[PII Protection Applied]"
+
+# Company names/symbols recognised in market queries, mapped to tickers
+_COMPANY_MAP = {
+    'apple': 'AAPL',
+    'aapl': 'AAPL',
+    'tesla': 'TSLA',
+    'tsla': 'TSLA',
+    'google': 'GOOGL',
+    'googl': 'GOOGL',
+    'alphabet': 'GOOGL'
+}
+_COMPANY_RE = re.compile(r'\b(' + '|'.join(map(re.escape, sorted(_COMPANY_MAP, key=len, reverse=True))) + ')')
+# Supported tickers, in the order results are reported
+_MARKET_SYMBOLS = ('AAPL', 'TSLA', 'GOOGL')
+
+# Placeholder SQL used when the LLM cannot generate a query
+_FALLBACK_SQL = "SELECT 1"
+
+# Determiners and pronouns that start a noun phrase rather than a customer's
+# first name ("holdings of all customers", "holdings for our clients")
+_NON_NAME_WORDS = (
+    'all', 'any', 'each', 'every', 'the', 'our', 'my', 'your', 'their', 'his',
+    'her', 'its', 'these', 'those', 'this', 'that', 'some', 'top', 'most',
+)
+
+# Common question shapes answered with fixed, parameterized SQL instead of an
+# LLM round-trip. Patterns match the lowercased, whitespace-normalized question;
+# captured groups become the statement parameters.
+_SQL_TEMPLATES = [
+    (
+        re.compile(r'how many customers (?:do we have|are there)\??'),
+        "SELECT COUNT(*) AS customer_count FROM customers"
+    ),
+    (
+        re.compile(
+            r'(?:show |list |what are )?(?:the )?(?:portfolio )?holdings (?:of|for) '
+            r'(?!(?:' + '|'.join(_NON_NAME_WORDS) + r') )([a-z]+) ([a-z]+)\??'
+        ),
+        "SELECT c.first_name, c.last_name, ph.symbol, ph.shares, ph.current_value "
+        "FROM customers c JOIN portfolio_holdings ph ON c.id = ph.customer_id "
+        "WHERE c.first_name = ? COLLATE NOCASE AND c.last_name = ? COLLATE NOCASE"
+    ),
+    (
+        re.compile(r'(?:show |list )?(?:all )?(?:the )?companies\??'),
+        "SELECT symbol, name, sector, market_cap FROM companies"
+    ),
+]
+
+
+def _match_sql_template(query: str) -> Optional[Tuple[str, tuple]]:
+    """Return (sql, params) if the question matches a known template"""
+    normalized = " ".join(query.lower().split())
+    for pattern, sql in _SQL_TEMPLATES:
+        match = pattern.fullmatch(normalized)
+        if match:
+            return sql, match.groups()
+    return None
+
+
+# Database schema description used as context for SQL generation
+_DB_SCHEMA_TEXT = """Enhanced Database Schema with Relationships:
 
 TABLE: customers (Customer Information)
 - id (PRIMARY KEY, INTEGER) - Unique customer identifier
@@ -198,14 +225,589 @@ KEY TIPS:
 - JOIN with companies to get full company names and sectors
 - JOIN with market_data to get current prices and volumes
 """
+
+# Yahoo Finance chart API
+_YF_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+# Only the quote metadata is used, so ask for the smallest possible series
+_YF_CHART_PARAMS = {'range': '1d', 'interval': '1d'}
+_YF_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+# Maximum number of Yahoo Finance requests in flight at once
+_YF_MAX_CONCURRENCY = 4
+# Retries for transient Yahoo Finance failures, with jittered exponential backoff
+_YF_MAX_RETRIES = 3
+_YF_BACKOFF_FACTOR = 0.25
+_YF_MAX_BACKOFF = 5.0
+_YF_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Overall deadline for one market data lookup, including retries and backoff
+_YF_TOTAL_TIMEOUT = 30.0
+
+# Seconds a successful read-only query result is reused
+_SQL_RESULT_CACHE_TTL = 30
+
+# Seconds a successful quote is served from memory before refetching
+_YF_CACHE_TTL = 60
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a fixed time"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry when full"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            elif len(self._data) >= self.maxsize:
+                self._data.popitem(last=False)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data)}
+
+
+_YF_CACHE = _TTLCache(maxsize=64, ttl=_YF_CACHE_TTL)
+
+# Shared HTTP client so connections (and TLS sessions) to Yahoo Finance are
+# reused across calls. httpx clients are bound to the event loop they run on,
+# so all fetches go through one long-lived background loop.
+_YF_CLIENT = None
+_BG_LOOP = None
+_BG_LOOP_LOCK = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting it on first use"""
+    global _BG_LOOP
+    with _BG_LOOP_LOCK:
+        if _BG_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="yf-event-loop", daemon=True).start()
+            _BG_LOOP = loop
+    return _BG_LOOP
+
+
+def _get_yf_client() -> httpx.AsyncClient:
+    """Return the pooled Yahoo Finance client (must be called on the background loop)"""
+    global _YF_CLIENT
+    if _YF_CLIENT is None:
+        _YF_CLIENT = httpx.AsyncClient(
+            headers=_YF_HEADERS,
+            timeout=10,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=8)
+        )
+    return _YF_CLIENT
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before the next attempt, honouring Retry-After if sent"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), _YF_MAX_BACKOFF)
+    return min(_YF_BACKOFF_FACTOR * (2 ** attempt) * random.uniform(0.5, 1.5), _YF_MAX_BACKOFF)
+
+
+async def _fetch_stock_data(client: httpx.AsyncClient, symbol: str, semaphore: asyncio.Semaphore) -> dict:
+    """Fetch real stock data for one symbol from Yahoo Finance API"""
+    try:
+        # Make API call to Yahoo Finance, retrying transient failures
+        for attempt in range(_YF_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await client.get(_YF_CHART_URL.format(symbol=symbol), params=_YF_CHART_PARAMS)
+            except httpx.TransportError:
+                if attempt == _YF_MAX_RETRIES:
+                    raise
+                delay = _retry_delay(attempt)
+            else:
+                if response.status_code not in _YF_RETRY_STATUSES or attempt == _YF_MAX_RETRIES:
+                    break
+                delay = _retry_delay(attempt, response)
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        
+        data = _json_loads(response.content)
+        
+        # Extract data from Yahoo Finance response
+        if 'chart' in data and 'result' in data['chart'] and len(data['chart']['result']) > 0:
+            result = data['chart']['result'][0]
+            
+            # Get current price
+            if 'meta' in result and 'regularMarketPrice' in result['meta']:
+                current_price = result['meta']['regularMarketPrice']
+            elif 'meta' in result and 'previousClose' in result['meta']:
+                current_price = result['meta']['previousClose']
+            else:
+                return {'success': False, 'error': 'Price data not available'}
+            
+            # Get previous close
+            previous_close = result['meta'].get('previousClose', current_price)
             
-            conn.close()
-            return schema_info
+            # Get volume
+            volume = result['meta'].get('regularMarketVolume', 0)
             
-        except Exception as e:
-            return f"Schema error: {e}\n\nFallback basic schema available."
+            # Get market cap
+            market_cap = result['meta'].get('marketCap', 0)
+            
+            # Calculate price change and change percentage
+            price_change = current_price - previous_close
+            change_percentage = (price_change / previous_close * 100) if previous_close > 0 else 0
+            
+            return {
+                'success': True,
+                'symbol': symbol,
+                'current_price': current_price,
+                'previous_close': previous_close,
+                'price_change': price_change,
+                'change_percentage': change_percentage,
+                'volume': volume,
+                'market_cap': market_cap
+            }
+        else:
+            return {'success': False, 'error': 'Invalid response format'}
+            
+    except httpx.HTTPError as e:
+        logger.error(f"Yahoo Finance API error for {symbol}: {e}")
+        return {'success': False, 'error': f'API request failed: {e}'}
+    except Exception as e:
+        logger.error(f"Error fetching stock data for {symbol}: {e}")
+        return {'success': False, 'error': f'Unexpected error: {e}'}
+
+
+async def _fetch_all_stock_data(symbols: List[str]) -> List[dict]:
+    """Fetch stock data for several symbols concurrently
+    
+    Requests are network-bound, so running them at the same time makes the
+    wall time roughly one round-trip instead of one per symbol. Recent
+    successful quotes are served from a short-lived cache.
+    """
+    results = {symbol: _YF_CACHE.get(symbol) for symbol in symbols}
+    missing = [symbol for symbol, data in results.items() if data is None]
+    
+    if missing:
+        semaphore = asyncio.Semaphore(_YF_MAX_CONCURRENCY)
+        client = _get_yf_client()
+        fetched = await asyncio.gather(*(_fetch_stock_data(client, symbol, semaphore) for symbol in missing))
+        for symbol, data in zip(missing, fetched):
+            # Only cache successful lookups so failures are retried next time
+            if data['success']:
+                _YF_CACHE.set(symbol, data)
+            results[symbol] = data
+    
+    logger.debug("Market data cache: %d of %d symbols cached (total %d hits, %d misses)",
+                 len(symbols) - len(missing), len(symbols), _YF_CACHE.hits, _YF_CACHE.misses)
+    return [results[symbol] for symbol in symbols]
+
+
+def _run_coroutine(coro):
+    """Run a coroutine on the background event loop and wait for the result
+    
+    Safe to call from synchronous code whether or not an event loop is
+    already running in the calling thread (e.g. a Jupyter notebook).
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    try:
+        return future.result(timeout=_YF_TOTAL_TIMEOUT)
+    except (concurrent.futures.TimeoutError, asyncio.TimeoutError):
+        future.cancel()
+        raise TimeoutError(f"no response within {_YF_TOTAL_TIMEOUT:g}s") from None
+
+
+async def _run_coroutine_async(coro):
+    """Await a coroutine that runs on the background event loop
+    
+    Lets async callers use the shared HTTP client without blocking their own
+    event loop.
+    """
+    future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _get_background_loop()))
+    try:
+        return await asyncio.wait_for(future, _YF_TOTAL_TIMEOUT)
+    except (concurrent.futures.TimeoutError, asyncio.TimeoutError):
+        raise TimeoutError(f"no response within {_YF_TOTAL_TIMEOUT:g}s") from None
+
+
+def _market_symbols(query: str) -> List[str]:
+    """Identify the tickers mentioned in a query (all supported ones if none)"""
+    # Map company names/symbols to ticker symbols (AAPL, TSLA, GOOGL)
+    found = {_COMPANY_MAP[match] for match in _COMPANY_RE.findall(query.lower())}
+    symbols = [symbol for symbol in _MARKET_SYMBOLS if symbol in found]
+    
+    # If no companies found, try to fetch all three
+    return symbols or list(_MARKET_SYMBOLS)
+
+
+def _format_market_data(symbols: List[str], all_stock_data: List[dict]) -> str:
+    """Format fetched stock data with price, change and volume per symbol"""
+    results = []
+    for symbol, stock_data in zip(symbols, all_stock_data):
+        if stock_data['success']:
+            parts = [
+                f"{symbol} ({stock_data.get('symbol', symbol)}):",
+                f"  Current Price: ${stock_data['current_price']:.2f}",
+                f"  Previous Close: ${stock_data['previous_close']:.2f}",
+                f"  Change: ${stock_data['price_change']:.2f} ({stock_data['change_percentage']:.2f}%)",
+                f"  Volume: {stock_data['volume']:,}"
+            ]
+            if stock_data.get('market_cap', 0) > 0:
+                parts.append(f"  Market Cap: ${stock_data['market_cap']:,.0f}")
+            parts.append("")
+            results.append("\n".join(parts))
+        else:
+            # Handle API failures with appropriate fallbacks
+            results.append(f"{symbol}: Error - {stock_data.get('error', 'Unknown error')}")
     
-    def create_function_tools(self):
+    if results:
+        return "\n".join(results)
+    return "No market data available. Please check your query mentions Apple (AAPL), Tesla (TSLA), or Google (GOOGL), or verify API connectivity."
+
+
+def _detect_pii_fields(field_names: list) -> set:
+    """Detect which fields contain PII based on field names"""
+    detected_pii = set()
+    
+    # Check each field name against patterns (case-insensitive)
+    for field_name in field_names:
+        field_lower = f"{field_name}".lower().strip()
+        
+        # Direct match, then any PII pattern inside the field name
+        if field_lower in _PII_PATTERNS or _PII_RE.search(field_lower):
+            detected_pii.add(field_name)
+    
+    return detected_pii
+
+
+def _mask_email(value_str: str) -> str:
+    """Email masking: abc@gmail.com -> ***@gmail.com"""
+    if '@' in value_str:
+        parts = value_str.split('@')
+        if len(parts) == 2:
+            return f"***@{parts[1]}"
+    return "***"
+
+
+def _mask_phone(value_str: str) -> str:
+    """Phone masking: 123-456-7890 -> ***-***-7890"""
+    # Remove common phone formatting
+    digits = _RE_NON_DIGIT.sub('', value_str)
+    if len(digits) >= 4:
+        # Keep last 4 digits
+        return f"***-***-{digits[-4:]}"
+    return "***-***-****"
+
+
+def _mask_address(value_str: str) -> str:
+    """Address masking: keep first few characters, mask the rest"""
+    if len(value_str) > 5:
+        return value_str[:2] + '*' * (len(value_str) - 2)
+    return "***"
+
+
+def _mask_ssn(value_str: str) -> str:
+    """SSN masking: 123-45-6789 -> ***-**-6789"""
+    digits = _RE_NON_DIGIT.sub('', value_str)
+    if len(digits) >= 4:
+        return f"***-**-{digits[-4:]}"
+    return "***-**-****"
+
+
+def _mask_default(value_str: str) -> str:
+    """Name and other PII masking: John -> ****"""
+    if len(value_str) > 0:
+        return '*' * min(len(value_str), 4)
+    return "****"
+
+
+# Maskers for well-known column names, checked before any pattern matching
+_KNOWN_PII_MASKERS = {
+    'email': _mask_email,
+    'email_address': _mask_email,
+    'phone': _mask_phone,
+    'phone_number': _mask_phone,
+    'telephone': _mask_phone,
+    'first_name': _mask_default,
+    'last_name': _mask_default,
+    'full_name': _mask_default,
+    'customer_name': _mask_default,
+    'name': _mask_default,
+    'address': _mask_address,
+    'street_address': _mask_address,
+    'ssn': _mask_ssn,
+    'social_security_number': _mask_ssn
+}
+
+
+def _pick_masker(field_lower: str):
+    """Choose the masking function for a (lowercased) PII field name"""
+    known = _KNOWN_PII_MASKERS.get(field_lower)
+    if known:
+        return known
+    
+    if 'email' in field_lower:
+        return _mask_email
+    elif 'phone' in field_lower or 'telephone' in field_lower:
+        return _mask_phone
+    elif 'name' in field_lower:
+        return _mask_default
+    elif 'address' in field_lower:
+        return _mask_address
+    elif 'ssn' in field_lower or 'social' in field_lower:
+        return _mask_ssn
+    else:
+        return _mask_default
+
+
+@lru_cache(maxsize=256)
+def _compile_row_masker(column_names: tuple):
+    """Generate a function that turns rows into masked row dicts
+    
+    The generated code is straight-line per column (PII columns call their
+    masker, others are copied), so there is no per-cell dispatch. Cached per
+    column layout; column names are embedded with repr() so any name is safe.
+    """
+    pii_fields = _detect_pii_fields(column_names)
+    namespace = {}
+    items = []
+    for i, col in enumerate(column_names):
+        if col in pii_fields:
+            namespace[f"_mask{i}"] = _pick_masker(col.lower())
+            items.append(f"{col!r}: (_mask{i}(f'{{r[{i}]}}') if r[{i}] else r[{i}])")
+        else:
+            items.append(f"{col!r}: r[{i}]")
+    
+    source = f"def _apply(rows):\n    return [{{{', '.join(items)}}} for r in rows]\n"
+    exec(source, namespace)
+    return namespace['_apply']
+
+
+# Tool descriptions used by the agent to route queries
+_DB_TOOL_DESC = (
+    "Query the customer and portfolio database using natural language. "
+    "This tool converts natural language queries into SQL and executes them "
+    "against the financial database. Use this for questions about customers, "
+    "portfolio holdings, company information, and financial metrics. "
+    "Returns formatted results with column information."
+)
+_MARKET_TOOL_DESC = (
+    "Get real-time stock market data from Yahoo Finance API. "
+    "Use this tool to fetch current stock prices, trading volumes, "
+    "price changes, and market capitalization for Apple (AAPL), "
+    "Tesla (TSLA), and Google (GOOGL). Query should mention company "
+    "names or stock symbols."
+)
+_PII_TOOL_DESC = (
+    "Automatically mask personally identifiable information (PII) in database results. "
+    "This tool detects sensitive fields like email addresses, phone numbers, "
+    "customer names, and applies appropriate masking to protect privacy. "
+    "Takes database results and column names as input, returns masked results."
+)
+
+
+def _make_tool(name: str, description: str, fn, async_fn=None) -> FunctionTool:
+    """Wrap a tool function (and optional async variant) as a FunctionTool
+    
+    Not memoized: each manager's tool functions close over that manager's
+    connection, caches and LLM, so tools cannot be shared between managers.
+    """
+    return FunctionTool.from_defaults(fn=fn, async_fn=async_fn, name=name, description=description)
+
+
+@lru_cache(maxsize=1)
+def _get_llm(api_base: str) -> OpenAI:
+    """Create the OpenAI LLM once and share it across managers"""
+    return OpenAI(
+        model="gpt-3.5-turbo",
+        temperature=0,
+        api_base=api_base
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_embed_model(api_base: str) -> OpenAIEmbedding:
+    """Create the OpenAI embedding model once and share it across managers"""
+    return OpenAIEmbedding(
+        model="text-embedding-ada-002",
+        api_base=api_base
+    )
+
+
+class FunctionToolsManager:
+    """Manager for all function tools - Database, market data, and PII protection"""
+    
+    def __init__(self, verbose: bool = False):
+        """Initialize function tools manager
+        
+        Args:
+            verbose: Unused, kept for compatibility. Progress is logged at
+                debug level; configure this module's logger to see it
+        """
+        self.verbose = verbose
+        self.project_root = Path.cwd()
+        self.db_path = self.project_root / "data" / "financial.db"
+        
+        # Database schema for SQL generation
+        self.db_schema = self._get_database_schema()
+        
+        # Storage for tools
+        self.function_tools: List[FunctionTool] = []
+        
+        # Shared SQLite connection, opened on first use; tools may run on
+        # any thread (coordinator worker pool, asyncio.to_thread), so access
+        # is serialized with a lock
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        
+        # Generated SQL that executed successfully, keyed on the question, and
+        # recent query results keyed on normalized SQL
+        self._generated_sql_cache = _TTLCache(maxsize=256, ttl=float('inf'))
+        self._sql_result_cache = _TTLCache(maxsize=128, ttl=_SQL_RESULT_CACHE_TTL)
+        
+        self._configure_settings()
+        
+        logger.debug("Function Tools Manager initialized")
+    
+    def _configure_settings(self):
+        """Configure LlamaIndex settings
+        
+        Requirements:
+        - Create OpenAI LLM with "gpt-3.5-turbo" model and temperature=0
+        - Set Settings.llm and Settings.embed_model
+        - Store LLM reference in self.llm for use in tools
+        
+        IMPORTANT NOTE FOR VOCAREUM:
+        LlamaIndex requires the api_base parameter to work with Vocareum's OpenAI endpoint.
+        Get the base URL from environment: os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
+        Pass it as api_base parameter to both OpenAI() and OpenAIEmbedding() constructors.
+        
+        Hint: This is similar to document_tools configuration
+        """
+        # Get API base URL for Vocareum compatibility
+        api_base = os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
+        
+        # Shared OpenAI LLM and embeddings with Vocareum compatibility
+        self.llm = _get_llm(api_base)
+        embed_model = _get_embed_model(api_base)
+        
+        # Set global LlamaIndex settings
+        Settings.llm = self.llm
+        Settings.embed_model = embed_model
+    
+    def _get_database_schema(self) -> str:
+        """Get enhanced database schema with relationships for SQL generation
+        
+        Returns a comprehensive schema description that helps the LLM
+        generate better SQL queries.
+        
+        Returns:
+            String containing detailed database schema with table relationships
+        """
+        # The schema text is static, so it is shared across instances
+        return _DB_SCHEMA_TEXT
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return the manager's database connection, opening it on first use
+        
+        Reusing the connection avoids re-opening the database file and
+        re-reading its header on every query. Callers must hold
+        self._conn_lock while using it.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA cache_size=-20000")
+            # Generated SQL must never modify the database; SQLite enforces
+            # this for any statement shape, not just the leading keyword
+            conn.execute("PRAGMA query_only = ON")
+            conn.row_factory = sqlite3.Row
+            self._conn = conn
+        return self._conn
+    
+    def _generate_sql(self, query_text: str, error_context: str = None) -> str:
+        """Generate SQL query from natural language using LLM
+        
+        LLM errors propagate; callers cache the SQL only once it has
+        executed successfully.
+        """
+        # Build prompt with database schema and query
+        prompt = f"""You are a SQL expert. Convert the following natural language query into a valid SQLite SQL query.
+
+Database Schema:
+{self.db_schema}
+
+Natural Language Query: {query_text}
+"""
+        
+        # Add error context if retrying after a failed query
+        if error_context:
+            prompt += f"\nPrevious SQL query failed with error: {error_context}\nPlease fix the SQL query."
+        
+        prompt += "\n\nGenerate ONLY the SQL query, no explanations, no markdown formatting. Return only the SQL statement."
+        
+        # Stream the LLM reply and stop at the end of the first
+        # statement - anything after it would be discarded anyway
+        stream = self.llm.stream_complete(prompt)
+        chunks = []
+        try:
+            for chunk in stream:
+                delta = chunk.delta or ""
+                chunks.append(delta)
+                if ';' in delta:
+                    break
+        finally:
+            # Closing the generator abandons the rest of the response
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+        sql_query = "".join(chunks).strip()
+        
+        # Clean up response - remove markdown code blocks if present
+        sql_query = _RE_SQL_FENCE.sub('', sql_query)
+        sql_query = sql_query.strip()
+        
+        # Handle multiple statements - take only the first one
+        if ';' in sql_query:
+            sql_query = sql_query.split(';')[0].strip()
+        
+        return sql_query
+    
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters for the manager's caches"""
+        return {
+            'sql_result_cache': self._sql_result_cache.stats(),
+            'market_data_cache': _YF_CACHE.stats()
+        }
+    
+    def create_function_tools(self) -> List[FunctionTool]:
         """Create function tools for database, market data, and PII protection
         
         This method creates three main function tools:
@@ -213,14 +815,16 @@ KEY TIPS:
         2. Market Search Tool - Fetches real-time stock data
         3. PII Protection Tool - Masks sensitive information
         
+        The tools are immutable once built: the list is assigned once, never
+        appended to afterwards, and repeated calls return the same list.
+        
         Returns:
             List of FunctionTool objects
         """
-        if self.verbose:
-            print("🛠️ Creating function tools...")
+        if self.function_tools:
+            return self.function_tools
         
-        # Clear existing tools
-        self.function_tools = []
+        logger.debug("Creating function tools")
         
         # Create the three main function tools
         # Implement these three nested functions and wrap them with FunctionTool:
@@ -244,67 +848,57 @@ KEY TIPS:
             
             def generate_sql(query_text: str, error_context: str = None) -> str:
                 """Generate SQL query from natural language using LLM"""
-                # Build prompt with database schema and query
-                prompt = f"""You are a SQL expert. Convert the following natural language query into a valid SQLite SQL query.
-
-Database Schema:
-{self.db_schema}
-
-Natural Language Query: {query_text}
-"""
-                
-                # Add error context if retrying after a failed query
-                if error_context:
-                    prompt += f"\nPrevious SQL query failed with error: {error_context}\nPlease fix the SQL query."
-                
-                prompt += "\n\nGenerate ONLY the SQL query, no explanations, no markdown formatting. Return only the SQL statement."
-                
                 try:
-                    # Use LLM to generate SQL
-                    response = self.llm.complete(prompt)
-                    sql_query = str(response.text).strip()
-                    
-                    # Clean up response - remove markdown code blocks if present
-                    sql_query = re.sub(r'```sql\s*', '', sql_query)
-                    sql_query = re.sub(r'```\s*', '', sql_query)
-                    sql_query = sql_query.strip()
-                    
-                    # Handle multiple statements - take only the first one
-                    if ';' in sql_query:
-                        sql_query = sql_query.split(';')[0].strip()
-                    
-                    return sql_query
+                    # Retries carry error context and are never served from cache
+                    if error_context:
+                        return self._generate_sql(query_text, error_context)
+                    cached = self._generated_sql_cache.get(query_text.strip())
+                    if cached is not None:
+                        return cached
+                    return self._generate_sql(query_text)
                 except Exception as e:
                     logger.error(f"Error generating SQL: {e}")
-                    return "SELECT 1"
+                    return _FALLBACK_SQL
             
-            def execute_sql(sql_query: str) -> Tuple[bool, list, list, str]:
+            def execute_sql(sql_query: str, params: tuple = ()) -> Tuple[bool, list, list, str]:
                 """Execute SQL and return (success, results, column_names, error)"""
+                # Quick first rejection of writes (the connection itself is
+                # query_only); the retry asks the LLM for a read-only query
+                if not _RE_READ_ONLY_SQL.match(sql_query):
+                    error_msg = "Only read-only SELECT queries are allowed"
+                    logger.error(f"SQL execution error: {error_msg}")
+                    return False, None, None, error_msg
+                
+                # Reuse a recent result for the same statement
+                cache_key = (" ".join(sql_query.split()), params)
+                cached = self._sql_result_cache.get(cache_key)
+                if cached is not None:
+                    results, column_names = cached
+                    return True, results, column_names, ""
+                
                 try:
-                    # Connect to database
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-                    
-                    # Execute query
-                    cursor.execute(sql_query)
-                    
-                    # Get column names
-                    column_names = [description[0] for description in cursor.description]
-                    
-                    # Fetch all results
-                    rows = cursor.fetchall()
-                    
-                    # Convert rows to list of dictionaries for easier formatting
-                    results = []
-                    for row in rows:
-                        row_dict = {}
-                        for i, col_name in enumerate(column_names):
-                            row_dict[col_name] = row[i]
-                        results.append(row_dict)
+                    with self._conn_lock:
+                        cursor = self._get_conn().cursor()
+                        
+                        # Execute query
+                        cursor.execute(sql_query, params)
+                        
+                        # Get column names
+                        column_names = [description[0] for description in cursor.description]
+                        
+                        # Fetch all results
+                        rows = cursor.fetchall()
+                        cursor.close()
                     
-                    # Close connection
-                    conn.close()
+                    # Convert rows to list of dictionaries for easier formatting,
+                    # masking PII columns while the values are still structured
+                    if _detect_pii_fields(column_names):
+                        # Row builder specialized for this column layout
+                        results = _compile_row_masker(tuple(column_names))(rows)
+                    else:
+                        results = [dict(row) for row in rows]
                     
+                    self._sql_result_cache.set(cache_key, (results, column_names))
                     return True, results, column_names, ""
                     
                 except Exception as e:
@@ -313,43 +907,70 @@ Natural Language Query: {query_text}
                     return False, None, None, error_msg
             
             try:
-                # Generate SQL from natural language query
-                sql_query = generate_sql(query)
+                # Known question shapes skip the LLM; otherwise generate SQL
+                # from the natural language query
+                template = _match_sql_template(query)
+                if template:
+                    sql_query, params = template
+                else:
+                    sql_query, params = generate_sql(query), ()
+                generated = template is None
                 
                 # Execute the SQL and get results
-                success, results, column_names, error = execute_sql(sql_query)
+                success, results, column_names, error = execute_sql(sql_query, params)
+                
+                # A template that matched but found nothing most likely
+                # misread the question; let the LLM handle it instead
+                if template and success and not results:
+                    sql_query, params = generate_sql(query), ()
+                    generated = True
+                    success, results, column_names, error = execute_sql(sql_query)
                 
                 # If execution fails, retry with error context
                 if not success:
                     # Retry with error context
-                    sql_query = generate_sql(query, error_context=error)
+                    sql_query, params = generate_sql(query, error_context=error), ()
+                    generated = True
                     success, results, column_names, error = execute_sql(sql_query)
                 
                 if not success:
                     return f"Database query failed: {error}\nSQL attempted: {sql_query}"
                 
+                # Only SQL that actually ran is reused for the same question
+                if generated and sql_query != _FALLBACK_SQL:
+                    self._generated_sql_cache.set(query.strip(), sql_query)
+                
                 # Format results with column names
                 # IMPORTANT: Include "COLUMNS:" prefix for PII detection
-                formatted_result = f"SQL Query: {sql_query}\n\n"
-                formatted_result += f"COLUMNS: {column_names}\n\n"
-                formatted_result += "Database Results:\n"
+                # Template parameters are customer names, so they are not echoed
+                parts = [f"SQL Query: {sql_query}", "", f"COLUMNS: {_dumps(column_names)}", "", "Database Results:"]
                 
                 if not results:
-                    formatted_result += "No results found."
+                    parts.append("No results found.")
                 else:
                     # Format each row
                     for i, row in enumerate(results, 1):
-                        formatted_result += f"Row {i}:\n"
-                        for col_name, value in row.items():
-                            formatted_result += f"  {col_name}: {value}\n"
-                        formatted_result += "\n"
+                        parts.append(f"Row {i}:")
+                        parts.extend(f"  {col_name}: {value}" for col_name, value in row.items())
+                        parts.append("")
+                    
+                    # PII columns were masked in execute_sql
+                    pii_fields = _detect_pii_fields(column_names)
+                    masked_fields = [col for col in column_names if col in pii_fields]
+                    if masked_fields:
+                        parts.append(f"{_PII_NOTICE} The following fields have been masked for privacy: {', '.join(masked_fields)}")
+                    parts.append("")
                 
-                return formatted_result
+                return "\n".join(parts)
                         
             except Exception as e:
                 logger.error(f"Database query tool error: {e}")
                 return f"Database system error: {e}"
         
+        async def database_query_tool_async(query: str) -> str:
+            """Async variant of database_query_tool; runs it on a worker thread"""
+            return await asyncio.to_thread(database_query_tool, query)
+        
         # 2. MARKET DATA TOOL
         def finance_market_search_tool(query: str) -> str:
             """Get real current stock prices and market information
@@ -364,115 +985,22 @@ Natural Language Query: {query_text}
                 String containing current market data
             """
             
-            def get_real_stock_data(symbol: str) -> dict:
-                """Fetch real stock data from Yahoo Finance API"""
-                try:
-                    # Make API call to Yahoo Finance
-                    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    }
-                    
-                    response = requests.get(url, headers=headers, timeout=10)
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    
-                    # Extract data from Yahoo Finance response
-                    if 'chart' in data and 'result' in data['chart'] and len(data['chart']['result']) > 0:
-                        result = data['chart']['result'][0]
-                        
-                        # Get current price
-                        if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                            current_price = result['meta']['regularMarketPrice']
-                        elif 'meta' in result and 'previousClose' in result['meta']:
-                            current_price = result['meta']['previousClose']
-                        else:
-                            return {'success': False, 'error': 'Price data not available'}
-                        
-                        # Get previous close
-                        previous_close = result['meta'].get('previousClose', current_price)
-                        
-                        # Get volume
-                        volume = result['meta'].get('regularMarketVolume', 0)
-                        
-                        # Get market cap
-                        market_cap = result['meta'].get('marketCap', 0)
-                        
-                        # Calculate price change and change percentage
-                        price_change = current_price - previous_close
-                        change_percentage = (price_change / previous_close * 100) if previous_close > 0 else 0
-                        
-                        return {
-                            'success': True,
-                            'symbol': symbol,
-                            'current_price': current_price,
-                            'previous_close': previous_close,
-                            'price_change': price_change,
-                            'change_percentage': change_percentage,
-                            'volume': volume,
-                            'market_cap': market_cap
-                        }
-                    else:
-                        return {'success': False, 'error': 'Invalid response format'}
-                        
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"Yahoo Finance API error for {symbol}: {e}")
-                    return {'success': False, 'error': f'API request failed: {str(e)}'}
-                except Exception as e:
-                    logger.error(f"Error fetching stock data for {symbol}: {e}")
-                    return {'success': False, 'error': f'Unexpected error: {str(e)}'}
-            
             try:
-                # Identify companies mentioned in the query
-                # Map company names/symbols to ticker symbols (AAPL, TSLA, GOOGL)
-                query_lower = query.lower()
-                symbols_to_fetch = []
-                
-                # Company name mappings
-                company_mappings = {
-                    'apple': 'AAPL',
-                    'aapl': 'AAPL',
-                    'tesla': 'TSLA',
-                    'tsla': 'TSLA',
-                    'google': 'GOOGL',
-                    'googl': 'GOOGL',
-                    'alphabet': 'GOOGL'
-                }
-                
-                # Check for each company in the query
-                for keyword, symbol in company_mappings.items():
-                    if keyword in query_lower:
-                        if symbol not in symbols_to_fetch:
-                            symbols_to_fetch.append(symbol)
-                
-                # If no companies found, try to fetch all three
-                if not symbols_to_fetch:
-                    symbols_to_fetch = ['AAPL', 'TSLA', 'GOOGL']
-                
-                # Fetch stock data for each identified company
-                results = []
-                for symbol in symbols_to_fetch:
-                    stock_data = get_real_stock_data(symbol)
+                # Fetch stock data for all identified companies concurrently
+                symbols_to_fetch = _market_symbols(query)
+                all_stock_data = _run_coroutine(_fetch_all_stock_data(symbols_to_fetch))
+                return _format_market_data(symbols_to_fetch, all_stock_data)
                     
-                    if stock_data['success']:
-                        # Format results with price, change, volume
-                        result_text = f"{symbol} ({stock_data.get('symbol', symbol)}):\n"
-                        result_text += f"  Current Price: ${stock_data['current_price']:.2f}\n"
-                        result_text += f"  Previous Close: ${stock_data['previous_close']:.2f}\n"
-                        result_text += f"  Change: ${stock_data['price_change']:.2f} ({stock_data['change_percentage']:.2f}%)\n"
-                        result_text += f"  Volume: {stock_data['volume']:,}\n"
-                        if stock_data.get('market_cap', 0) > 0:
-                            result_text += f"  Market Cap: ${stock_data['market_cap']:,.0f}\n"
-                        results.append(result_text)
-                    else:
-                        # Handle API failures with appropriate fallbacks
-                        results.append(f"{symbol}: Error - {stock_data.get('error', 'Unknown error')}")
-                
-                if results:
-                    return "\n".join(results)
-                else:
-                    return "No market data available. Please check your query mentions Apple (AAPL), Tesla (TSLA), or Google (GOOGL), or verify API connectivity."
+            except Exception as e:
+                logger.error(f"Market data tool error: {e}")
+                return f"Market data error: {e}"
+        
+        async def finance_market_search_tool_async(query: str) -> str:
+            """Async variant of finance_market_search_tool for agents that await tools"""
+            try:
+                symbols_to_fetch = _market_symbols(query)
+                all_stock_data = await _run_coroutine_async(_fetch_all_stock_data(symbols_to_fetch))
+                return _format_market_data(symbols_to_fetch, all_stock_data)
                     
             except Exception as e:
                 logger.error(f"Market data tool error: {e}")
@@ -493,106 +1021,20 @@ Natural Language Query: {query_text}
                 String with PII fields masked for privacy protection
             """
             
-            def detect_pii_fields(field_names: list) -> set:
-                """Detect which fields contain PII based on field names"""
-                # Create patterns for common PII field names
-                pii_patterns = {
-                    # Email patterns
-                    'email', 'email_address', 'e_mail', 'e-mail', 'email_addr',
-                    # Phone patterns
-                    'phone', 'phone_number', 'telephone', 'mobile', 'cell', 'contact_number',
-                    # Name patterns
-                    'first_name', 'last_name', 'full_name', 'customer_name', 'name', 'given_name', 'surname',
-                    # Address patterns
-                    'address', 'street_address', 'mailing_address', 'home_address', 'physical_address',
-                    # SSN patterns
-                    'ssn', 'social_security_number', 'tax_id', 'tax_id_number', 'ssn_number'
-                }
-                
-                detected_pii = set()
-                
-                # Check each field name against patterns (case-insensitive)
-                for field_name in field_names:
-                    field_lower = str(field_name).lower().strip()
-                    
-                    # Direct match
-                    if field_lower in pii_patterns:
-                        detected_pii.add(field_name)
-                        continue
-                    
-                    # Pattern matching - check if any PII pattern is in the field name
-                    for pattern in pii_patterns:
-                        if pattern in field_lower:
-                            detected_pii.add(field_name)
-                            break
-                
-                return detected_pii
-            
-            def mask_field_value(field_name: str, value: str) -> str:
-                """Apply appropriate masking based on field type"""
-                if not value:
-                    return str(value)
-                
-                field_lower = str(field_name).lower()
-                value_str = str(value)
-                
-                # Email masking: abc@gmail.com -> ***@gmail.com
-                if 'email' in field_lower:
-                    if '@' in value_str:
-                        parts = value_str.split('@')
-                        if len(parts) == 2:
-                            return f"***@{parts[1]}"
-                    return "***"
-                
-                # Phone masking: 123-456-7890 -> ***-***-7890
-                elif 'phone' in field_lower or 'telephone' in field_lower:
-                    # Remove common phone formatting
-                    digits = re.sub(r'[^\d]', '', value_str)
-                    if len(digits) >= 4:
-                        # Keep last 4 digits
-                        return f"***-***-{digits[-4:]}"
-                    return "***-***-****"
-                
-                # Name masking: John -> ****
-                elif 'name' in field_lower:
-                    # Simple masking - replace with asterisks
-                    if len(value_str) > 0:
-                        return '*' * min(len(value_str), 4)
-                    return "****"
-                
-                # Address masking: Show partial address
-                elif 'address' in field_lower:
-                    # Keep first few characters, mask the rest
-                    if len(value_str) > 5:
-                        return value_str[:2] + '*' * (len(value_str) - 2)
-                    return "***"
-                
-                # SSN masking: 123-45-6789 -> ***-**-6789
-                elif 'ssn' in field_lower or 'social' in field_lower:
-                    digits = re.sub(r'[^\d]', '', value_str)
-                    if len(digits) >= 4:
-                        return f"***-**-{digits[-4:]}"
-                    return "***-**-****"
-                
-                # Default masking for other PII fields
-                else:
-                    if len(value_str) > 0:
-                        return '*' * min(len(value_str), 4)
-                    return "****"
-            
             # Parse column names
             try:
                 # Column names might be a string representation of a list
                 if isinstance(column_names, str):
-                    # Try to parse as JSON or Python list
+                    # The database tool emits column names as a JSON list
                     try:
-                        import ast
-                        cols = ast.literal_eval(column_names)
-                    except:
+                        cols = _json_loads(column_names)
+                        if not isinstance(cols, list):
+                            raise ValueError("column_names is not a list")
+                    except ValueError:
                         # Try regex extraction
-                        cols = re.findall(r"'([^']+)'", column_names)
+                        cols = _RE_SQ.findall(column_names)
                         if not cols:
-                            cols = re.findall(r'"([^"]+)"', column_names)
+                            cols = _RE_DQ.findall(column_names)
                         if not cols:
                             # Fallback: split by comma
                             cols = [c.strip() for c in column_names.split(',')]
@@ -600,35 +1042,36 @@ Natural Language Query: {query_text}
                     cols = list(column_names)
                 
                 # Detect PII fields
-                pii_fields = detect_pii_fields(cols)
+                pii_fields = _detect_pii_fields(cols)
                 
                 if not pii_fields:
                     # No PII detected, return original
                     return database_results
                 
+                # Only PII fields that actually appear as "field:" in the text
+                # need masking; if none do, skip the line-by-line pass
+                pii_fields = {field for field in pii_fields if f"{field}:" in database_results}
+                if not pii_fields:
+                    return database_results
+                
                 # Parse database results line by line
+                col_maskers = {field: _pick_masker(f"{field}".lower()) for field in pii_fields}
                 lines = database_results.split('\n')
                 protected_lines = []
                 masked_fields_notice = []
                 
                 for line in lines:
-                    # Check if this line contains data (not headers or formatting)
-                    if ':' in line and any(col in line for col in cols):
-                        # Extract field-value pairs
-                        for col in cols:
-                            if col in line:
-                                # Find the value after the colon
-                                parts = line.split(':', 1)
-                                if len(parts) == 2:
-                                    field_name = parts[0].strip()
-                                    value = parts[1].strip()
-                                    
-                                    # Mask if it's a PII field
-                                    if field_name in pii_fields:
-                                        masked_value = mask_field_value(field_name, value)
-                                        line = line.replace(value, masked_value)
-                                        if field_name not in masked_fields_notice:
-                                            masked_fields_notice.append(field_name)
+                    # Data lines are formatted as "  field_name: value"
+                    key, sep, value = line.partition(':')
+                    field_name = key.strip()
+                    
+                    # Mask if it's a PII field
+                    if sep and field_name in col_maskers:
+                        value = value.strip()
+                        masked_value = col_maskers[field_name](value) if value else value
+                        line = f"{key}: {masked_value}"
+                        if field_name not in masked_fields_notice:
+                            masked_fields_notice.append(field_name)
                     
                     protected_lines.append(line)
                 
@@ -636,7 +1079,7 @@ Natural Language Query: {query_text}
                 protected_result = '\n'.join(protected_lines)
                 
                 if masked_fields_notice:
-                    notice = f"\n\n[PII Protection Applied] The following fields have been masked for privacy: {', '.join(masked_fields_notice)}"
+                    notice = f"\n\n{_PII_NOTICE} The following fields have been masked for privacy: {', '.join(masked_fields_notice)}"
                     protected_result += notice
                 
                 return protected_result
@@ -651,53 +1094,24 @@ Natural Language Query: {query_text}
         # Provide descriptive names and descriptions for agent routing
         # Add all tools to self.function_tools list
         
-        # 1. Database Query Tool
-        db_tool = FunctionTool.from_defaults(
-            fn=database_query_tool,
-            name="database_query_tool",
-            description=(
-                "Query the customer and portfolio database using natural language. "
-                "This tool converts natural language queries into SQL and executes them "
-                "against the financial database. Use this for questions about customers, "
-                "portfolio holdings, company information, and financial metrics. "
-                "Returns formatted results with column information."
-            )
-        )
-        self.function_tools.append(db_tool)
-        
-        # 2. Market Data Tool
-        market_tool = FunctionTool.from_defaults(
-            fn=finance_market_search_tool,
-            name="finance_market_search_tool",
-            description=(
-                "Get real-time stock market data from Yahoo Finance API. "
-                "Use this tool to fetch current stock prices, trading volumes, "
-                "price changes, and market capitalization for Apple (AAPL), "
-                "Tesla (TSLA), and Google (GOOGL). Query should mention company "
-                "names or stock symbols."
-            )
-        )
-        self.function_tools.append(market_tool)
-        
-        # 3. PII Protection Tool
-        pii_tool = FunctionTool.from_defaults(
-            fn=pii_protection_tool,
-            name="pii_protection_tool",
-            description=(
-                "Automatically mask personally identifiable information (PII) in database results. "
-                "This tool detects sensitive fields like email addresses, phone numbers, "
-                "customer names, and applies appropriate masking to protect privacy. "
-                "Takes database results and column names as input, returns masked results."
-            )
+        tool_specs = (
+            # 1. Database Query Tool
+            ("database_query_tool", _DB_TOOL_DESC, database_query_tool, database_query_tool_async),
+            # 2. Market Data Tool
+            ("finance_market_search_tool", _MARKET_TOOL_DESC, finance_market_search_tool, finance_market_search_tool_async),
+            # 3. PII Protection Tool
+            ("pii_protection_tool", _PII_TOOL_DESC, pii_protection_tool, None)
         )
-        self.function_tools.append(pii_tool)
+        self.function_tools = [
+            _make_tool(name, description, fn, async_fn)
+            for name, description, fn, async_fn in tool_specs
+        ]
         
-        if self.verbose:
-            print("   ✅ Function tools created")
+        logger.debug("Created %d function tools", len(self.function_tools))
         
         return self.function_tools
     
-    def get_tools(self):
+    def get_tools(self) -> List[FunctionTool]:
         """Get all function tools
         
         Returns:
@@ -301,6 +301,110 @@ COLUMNS: ['id', 'first_name', 'email']"""
         except Exception as e:
             pytest.fail(f"❌ PII detection and protection test failed: {e}")
 
+    def test_routing_decision_cache(self):
+        """Test 13: Repeated queries reuse the cached routing decision"""
+        print("\n" + "="*60)
+        print("TEST 13: Routing Decision Cache")
+        print("="*60)
+        
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        
+        market_tool = Mock()
+        market_tool.metadata.name = "finance_market_search_tool"
+        market_tool.metadata.description = "Market data"
+        market_tool.call.return_value = "AAPL: $150.00"
+        agent.setup(document_tools=[], function_tools=[market_tool])
+        
+        agent.llm = Mock()
+        agent.llm.complete.return_value = Mock(text="0")
+        # Embeddings unavailable: routing falls back to the memoized LLM router
+        agent._embed_query = Mock(side_effect=ConnectionError("offline"))
+        
+        first = agent._route_query("What is Apple's stock price?")
+        second = agent._route_query("  what is apple's stock price?")
+        
+        assert first == second == [("finance_market_search_tool", "Market data", "AAPL: $150.00")]
+        assert agent.llm.complete.call_count == 1, "❌ Routing LLM should be called once for repeat queries"
+        print("✅ Routing decision reused for repeated query")
+        
+        agent._route_llm.cache_clear()
+        agent._route_query("What is Apple's stock price?")
+        assert agent.llm.complete.call_count == 2, "❌ Clearing the cache should force a new routing call"
+        print("✅ Cache invalidation forces fresh routing")
+        
+        assert agent._embed_query.call_count == 1, "❌ Embedding failure should pause the semantic cache"
+        print("✅ Embedding outage skips the semantic routing cache")
+
+    def test_semantic_routing_cache(self):
+        """Test 14: Paraphrased queries reuse routing via embedding similarity"""
+        print("\n" + "="*60)
+        print("TEST 14: Semantic Routing Cache")
+        print("="*60)
+        
+        import numpy as np
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        
+        market_tool = Mock()
+        market_tool.metadata.name = "finance_market_search_tool"
+        market_tool.metadata.description = "Market data"
+        market_tool.call.return_value = "AAPL: $150.00"
+        agent.setup(document_tools=[], function_tools=[market_tool])
+        
+        agent.llm = Mock()
+        agent.llm.complete.return_value = Mock(text="0")
+        
+        embeddings = {
+            "apple revenue?": np.array([1.0, 0.0, 0.0], dtype=np.float32),
+            "what was aapl's revenue?": np.array([0.96, 0.28, 0.0], dtype=np.float32),
+            "show customer holdings": np.array([0.0, 0.0, 1.0], dtype=np.float32),
+        }
+        agent._embed_query = lambda text: embeddings[text]
+        
+        agent._route_query("Apple revenue?")
+        agent._route_query("What was AAPL's revenue?")
+        assert agent.llm.complete.call_count == 1, "❌ Similar query should reuse cached routing"
+        print("✅ Paraphrase served from semantic routing cache")
+        
+        agent._route_query("Show customer holdings")
+        assert agent.llm.complete.call_count == 2, "❌ Dissimilar query should call the routing LLM"
+        print("✅ Dissimilar query routed by the LLM")
+    
+    def test_semantic_routing_cache_respects_company(self):
+        """Test 14b: Similar queries about different companies are routed separately"""
+        print("\n" + "="*60)
+        print("TEST 14b: Semantic Routing Cache Companies")
+        print("="*60)
+        
+        import numpy as np
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        
+        tools = []
+        for name in ("aapl_10k_filing_tool", "tsla_10k_filing_tool"):
+            tool = Mock()
+            tool.metadata.name = name
+            tool.metadata.description = "SEC filing"
+            tools.append(tool)
+        agent.setup(document_tools=tools, function_tools=[])
+        
+        agent.llm = Mock()
+        agent.llm.complete.side_effect = [Mock(text="0"), Mock(text="1")]
+        
+        embeddings = {
+            "what are apple's main risks?": np.array([1.0, 0.0, 0.0], dtype=np.float32),
+            "what are tesla's main risks?": np.array([0.99, 0.14, 0.0], dtype=np.float32),
+        }
+        agent._embed_query = lambda text: embeddings[text]
+        
+        apple = agent._route_query("What are Apple's main risks?")
+        tesla = agent._route_query("What are Tesla's main risks?")
+        assert [entry[0] for entry in apple] == ["aapl_10k_filing_tool"]
+        assert [entry[0] for entry in tesla] == ["tsla_10k_filing_tool"], "❌ Tesla query reused Apple's route"
+        assert agent.llm.complete.call_count == 2
+        print("✅ Company mismatch bypasses semantic routing cache")
+
 class TestQueryProcessing:
     """Test main query processing functionality"""
     
@@ -369,6 +473,120 @@ class TestQueryProcessing:
         except Exception as e:
             pytest.fail(f"❌ Result synthesis test failed: {e}")
 
+    def test_query_batch(self):
+        """Test 15: Batched routing answers every question in order"""
+        print("\n" + "="*60)
+        print("TEST 15: Batched Query Routing")
+        print("="*60)
+        
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        
+        db_tool = Mock()
+        db_tool.metadata.name = "database_query_tool"
+        db_tool.metadata.description = "Customer database"
+        db_tool.call.return_value = "No results found."
+        market_tool = Mock()
+        market_tool.metadata.name = "finance_market_search_tool"
+        market_tool.metadata.description = "Market data"
+        market_tool.call.side_effect = lambda query: f"market: {query}"
+        agent.setup(document_tools=[], function_tools=[db_tool, market_tool])
+        agent._tools_initialized = True
+        
+        agent.llm = Mock()
+        agent.llm.complete.return_value = Mock(text='{"0": [1], "1": [1], "2": [1]}')
+        
+        questions = ["AAPL price?", "TSLA price?", "GOOGL price?"]
+        answers = agent.query_batch(questions)
+        
+        assert answers == [f"market: {q}" for q in questions], "❌ Answers should follow question order"
+        assert agent.llm.complete.call_count == 1, "❌ One routing call should cover the whole batch"
+        print("✅ Three questions routed with one LLM call")
+        
+        agent.llm.complete.return_value = Mock(text='{"0": [true, 1], "1": [false]}')
+        assert agent._route_batch(["AAPL price?", "TSLA price?"]) == [[1], None], "❌ JSON booleans are not tool indices"
+        print("✅ Boolean indices ignored")
+        
+        # Unparseable batch routing falls back to per-query routing
+        import numpy as np
+        embeddings = {
+            "show customer holdings": np.array([1.0, 0.0], dtype=np.float32),
+            "any portfolio data?": np.array([0.0, 1.0], dtype=np.float32),
+        }
+        agent._embed_query = lambda text: embeddings[text]
+        agent.llm.complete.return_value = Mock(text="not json")
+        answers = agent.query_batch(["Show customer holdings", "Any portfolio data?"])
+        assert len(answers) == 2, "❌ Fallback routing should still answer every question"
+        print("✅ Unparseable batch routing falls back to per-query routing")
+
+    def test_synthesis_skip(self):
+        """Test 17: Small independent results skip LLM synthesis; others stream"""
+        print("\n" + "="*60)
+        print("TEST 17: Synthesis Skip Heuristic")
+        print("="*60)
+        
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        agent.llm = Mock()
+        agent.llm.stream_complete.side_effect = lambda prompt: iter(
+            [Mock(delta="\n Synthesized"), Mock(delta=" answer"), Mock(delta="\n")]
+        )
+        
+        tool_results = [
+            ("finance_market_search_tool", "Market data", "AAPL: $150.00"),
+            ("database_query_tool", "Customer database", "Row 1:\n  shares: 50"),
+        ]
+        
+        answer = agent._synthesize_results("AAPL price and my shares?", tool_results)
+        assert "From finance_market_search_tool" in answer and "From database_query_tool" in answer
+        assert agent.llm.stream_complete.call_count == 0, "❌ Small independent results should skip synthesis"
+        print("✅ Synthesis skipped for small independent results")
+        
+        answer = agent._synthesize_results("Compare AAPL price vs my shares", tool_results)
+        assert answer == "Synthesized answer", "❌ Comparison questions should be synthesized"
+        print("✅ Comparison questions still use LLM synthesis")
+        
+        chunks = list(agent._stream_results("Compare AAPL price vs my shares", tool_results))
+        assert chunks == ["Synthesized", " answer"], "❌ Synthesis should stream token chunks"
+        print("✅ Synthesis streams token by token")
+        
+        agent.enable_synthesis_skip = False
+        agent._synthesize_results("AAPL price and my shares?", tool_results)
+        assert agent.llm.stream_complete.call_count == 3, "❌ Disabling the skip should always synthesize"
+        print("✅ enable_synthesis_skip=False always synthesizes")
+    
+    def test_synthesis_error_midstream(self):
+        """Test 17b: A synthesis error after the first token still yields the fallback answer"""
+        print("\n" + "="*60)
+        print("TEST 17b: Synthesis Error Midstream")
+        print("="*60)
+        
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        agent._tools_initialized = True
+        
+        def failing_stream(prompt):
+            yield Mock(delta="Partial")
+            raise ConnectionError("stream dropped")
+        
+        agent.llm = Mock()
+        agent.llm.stream_complete.side_effect = failing_stream
+        
+        tool_results = [
+            ("finance_market_search_tool", "Market data", "AAPL: $150.00"),
+            ("database_query_tool", "Customer database", "Row 1:\n  shares: 50"),
+        ]
+        agent._route_query = Mock(return_value=tool_results)
+        question = "Compare AAPL price vs my shares"
+        fallback = agent._format_fallback_answer(question, tool_results)
+        
+        assert agent.query(question) == fallback, "❌ query() should return the full fallback answer"
+        print("✅ query() falls back to the tool results")
+        
+        chunks = list(agent.query_stream(question))
+        assert chunks[0] == "Partial" and chunks[-1] == fallback, "❌ Stream should continue with the fallback"
+        print("✅ query_stream() sends the fallback after the partial answer")
+
 class TestIntegrationScenarios:
     """Test complete integration scenarios"""
     
@@ -413,6 +631,71 @@ class TestIntegrationScenarios:
         except Exception as e:
             pytest.fail(f"❌ Integration test failed: {e}")
 
+class TestToolExecution:
+    """Test parallel execution of the selected tools"""
+    
+    def test_parallel_execution_preserves_order(self):
+        """Test 12: Parallel tool execution keeps routing order"""
+        print("\n" + "="*60)
+        print("TEST 12: Parallel Tool Execution")
+        print("="*60)
+        
+        import time
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        
+        def make_tool(delay, output):
+            tool = Mock()
+            tool.call.side_effect = lambda query: (time.sleep(delay), output)[1]
+            return tool
+        
+        failing_tool = Mock()
+        failing_tool.call.side_effect = RuntimeError("boom")
+        
+        selected = [
+            ("slow_tool", "slow", make_tool(0.2, "slow result"), 'function'),
+            ("fast_tool", "fast", make_tool(0.0, "fast result"), 'function'),
+            ("failing_tool", "fails", failing_tool, 'function'),
+        ]
+        
+        with patch.dict(os.environ, {"TOOL_CONCURRENCY_LIMIT": "4"}):
+            results = agent._execute_tools(selected, "test query")
+        
+        assert [name for name, _, _ in results] == ["slow_tool", "fast_tool", "failing_tool"], \
+            "❌ Results should follow routing order"
+        assert results[0][2] == "slow result"
+        assert results[1][2] == "fast result"
+        assert results[2][2] == "Error: boom", "❌ Tool errors should be captured per tool"
+        print("✅ Parallel execution keeps order and isolates errors")
+        
+        with patch.dict(os.environ, {"TOOL_CONCURRENCY_LIMIT": "1"}):
+            sequential = agent._execute_tools(selected, "test query")
+        assert sequential == results, "❌ Sequential mode should give identical results"
+        print("✅ TOOL_CONCURRENCY_LIMIT=1 runs tools sequentially")
+
+    def test_document_result_cache(self):
+        """Test 16: Repeated document questions reuse cached answers"""
+        print("\n" + "="*60)
+        print("TEST 16: Document Result Cache")
+        print("="*60)
+        
+        from helper_modules.agent_coordinator import AgentCoordinator
+        agent = AgentCoordinator()
+        
+        doc_tool = Mock()
+        doc_tool.metadata.name = "AAPL_10k_filing_tool"
+        doc_tool.metadata.description = "Apple 10-K"
+        doc_tool.query_engine.query.return_value = "Apple revenue was $391B"
+        agent.setup(document_tools=[doc_tool], function_tools=[])
+        
+        entry = agent._selected_tool_entries([0])[0]
+        first = agent._execute_tool(entry, "What was Apple's revenue?")
+        second = agent._execute_tool(entry, "  what was apple's revenue?")
+        
+        assert first == second == ("AAPL_10k_filing_tool", "Apple 10-K", "Apple revenue was $391B")
+        assert doc_tool.query_engine.query.call_count == 1, "❌ Repeated question should hit the cache"
+        print("✅ Document answer served from cache")
+
 def run_comprehensive_test():
     """Run all tests with detailed reporting"""
     print("🚀 AGENT COORDINATOR COMPREHENSIVE TEST FRAMEWORK")
@@ -429,7 +712,8 @@ def run_comprehensive_test():
         TestToolManagement,
         TestIntelligentRouting,
         TestQueryProcessing,
-        TestIntegrationScenarios
+        TestIntegrationScenarios,
+        TestToolExecution
     ]
     
     total_tests = 0
@@ -660,6 +660,8 @@ class TestFunctionTools:
                 assert hasattr(tool, 'metadata'), f"Tool {i} missing metadata"
                 assert hasattr(tool.metadata, 'name'), f"Tool {i} missing name"
             
+            assert manager.create_function_tools() is tools, "Tools should be built once and reused"
+            
             print(f"✅ Created {len(tools)} function tools successfully")
             for tool in tools:
                 print(f"   📋 Tool: {tool.metadata.name}")
@@ -775,6 +777,386 @@ class TestFunctionTools:
             print("💡 HINT: Implement pattern matching for PII fields")
             print("💡 HINT: Apply consistent masking strategies")
             pytest.fail(f"PII protection error: {e}")
+    
+    def test_market_data_cache(self, monkeypatch):
+        """Test 9: Repeated market lookups are served from the TTL cache"""
+        print("\n" + "="*60)
+        print("TEST 9: Market Data Cache")
+        print("="*60)
+        
+        import function_tools
+        
+        calls = []
+        
+        async def fake_fetch(client, symbol, semaphore):
+            calls.append(symbol)
+            if symbol == 'TSLA':
+                return {'success': False, 'error': 'API request failed'}
+            return {'success': True, 'symbol': symbol, 'current_price': 100.0}
+        
+        monkeypatch.setattr(function_tools, '_fetch_stock_data', fake_fetch)
+        function_tools._YF_CACHE.clear()
+        
+        try:
+            fetch = lambda symbols: function_tools._run_coroutine(function_tools._fetch_all_stock_data(symbols))
+            
+            first = fetch(['AAPL', 'TSLA'])
+            second = fetch(['AAPL', 'TSLA'])
+            
+            assert [r['success'] for r in first] == [True, False]
+            assert second == first, "Cached results should match the original fetch"
+            assert calls == ['AAPL', 'TSLA', 'TSLA'], "Only failed lookups should be refetched"
+            assert (function_tools._YF_CACHE.hits, function_tools._YF_CACHE.misses) == (1, 3)
+            print("✅ Successful quotes cached, failures retried")
+        finally:
+            function_tools._YF_CACHE.clear()
+    
+    def test_pii_masking_by_field(self):
+        """Test 10: PII masking only rewrites the value of the matching field"""
+        print("\n" + "="*60)
+        print("TEST 10: PII Masking by Field")
+        print("="*60)
+        
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        results = (
+            'COLUMNS: ["first_name", "referral_code"]\n\n'
+            "Database Results:\n"
+            "Row 1:\n"
+            "  first_name: first\n"
+            "  referral_code: first\n"
+        )
+        protected = tools['pii_protection_tool'].fn(results, '["first_name", "referral_code"]')
+        
+        assert "  first_name: ****" in protected, "Field name must not be rewritten"
+        assert "  referral_code: first" in protected, "Non-PII fields must be left untouched"
+        print("✅ Only PII field values were masked")
+    
+    def test_sql_generation_stops_at_semicolon(self):
+        """Test 11: SQL generation stops reading the LLM stream after the first statement"""
+        print("\n" + "="*60)
+        print("TEST 11: Streaming SQL Generation")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        consumed = []
+        
+        def fake_stream(prompt):
+            for delta in ["SELECT COUNT(*) ", "AS total FROM customers", ";", " -- explanation", " that is never read"]:
+                consumed.append(delta)
+                yield Mock(delta=delta)
+        
+        manager.llm = Mock()
+        manager.llm.stream_complete.side_effect = fake_stream
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        result = tools['database_query_tool'].fn("What is the total number of customers?")
+        
+        assert "SQL Query: SELECT COUNT(*) AS total FROM customers" in result
+        assert "total: 10" in result
+        assert " that is never read" not in consumed, "Stream should be abandoned after the semicolon"
+        print("✅ SQL generation stopped at the first semicolon")
+    
+    def test_repeated_database_query_cached(self):
+        """Test 12: Repeated questions reuse the generated SQL and its results"""
+        print("\n" + "="*60)
+        print("TEST 12: Database Query Cache")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        manager.llm = Mock()
+        manager.llm.stream_complete.side_effect = lambda prompt: iter([Mock(delta="SELECT COUNT(*) AS total FROM customers;")])
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        first = tools['database_query_tool'].fn("What is the total number of customers?")
+        second = tools['database_query_tool'].fn("What is the total number of customers? ")
+        
+        assert first == second
+        assert manager.llm.stream_complete.call_count == 1, "Second question should not call the LLM"
+        assert manager._sql_result_cache.get(("SELECT COUNT(*) AS total FROM customers", ())) is not None
+        print("✅ Repeated question served from cache")
+    
+    def test_failed_sql_not_cached(self):
+        """Test 12b: Only generated SQL that executed successfully is reused"""
+        print("\n" + "="*60)
+        print("TEST 12b: Failed SQL Not Cached")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        replies = iter([
+            "SELECT missing_column FROM customers;",
+            "SELECT COUNT(*) AS total FROM customers;",
+        ])
+        manager.llm = Mock()
+        manager.llm.stream_complete.side_effect = lambda prompt: iter([Mock(delta=next(replies))])
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        first = tools['database_query_tool'].fn("What is the total number of customers?")
+        second = tools['database_query_tool'].fn("What is the total number of customers? ")
+        
+        assert "total: 10" in first and "total: 10" in second
+        assert manager.llm.stream_complete.call_count == 2, "Second question should reuse the working SQL"
+        assert manager._generated_sql_cache.get("What is the total number of customers?") == \
+            "SELECT COUNT(*) AS total FROM customers"
+        print("✅ Failing SQL is not reused")
+    
+    def test_write_statements_rejected(self):
+        """Test 13: Non-SELECT SQL is rejected and regenerated as a read-only query"""
+        print("\n" + "="*60)
+        print("TEST 13: Read-only SQL")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        replies = iter([
+            "UPDATE customers SET first_name = first_name;",
+            "SELECT COUNT(*) AS total FROM customers;"
+        ])
+        manager.llm = Mock()
+        manager.llm.stream_complete.side_effect = lambda prompt: iter([Mock(delta=next(replies))])
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        result = tools['database_query_tool'].fn("Reset customer names")
+        
+        retry_prompt = manager.llm.stream_complete.call_args_list[1].args[0]
+        assert "Only read-only SELECT queries are allowed" in retry_prompt
+        assert "total: 10" in result
+        print("✅ Write statement rejected before execution")
+    
+    def test_cte_write_statements_blocked(self, tmp_path):
+        """Test 13b: Writes hidden behind a WITH clause are blocked by the connection"""
+        print("\n" + "="*60)
+        print("TEST 13b: Read-only Connection")
+        print("="*60)
+        
+        import shutil
+        import sqlite3
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        # Work on a copy so a regression cannot damage the shipped database
+        db_copy = tmp_path / "financial.db"
+        shutil.copy(manager.db_path, db_copy)
+        manager.db_path = db_copy
+        
+        replies = iter([
+            "WITH x AS (SELECT 1) DELETE FROM customers;",
+            "SELECT COUNT(*) AS total FROM customers;"
+        ])
+        manager.llm = Mock()
+        manager.llm.stream_complete.side_effect = lambda prompt: iter([Mock(delta=next(replies))])
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        result = tools['database_query_tool'].fn("Remove every customer")
+        
+        retry_prompt = manager.llm.stream_complete.call_args_list[1].args[0]
+        assert "readonly" in retry_prompt.lower()
+        assert "total: 10" in result
+        with sqlite3.connect(db_copy) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 10
+        print("✅ CTE write blocked by the read-only connection")
+    
+    def test_database_results_masked_at_source(self):
+        """Test 14: Database results come back with PII columns already masked"""
+        print("\n" + "="*60)
+        print("TEST 14: PII Masking in Database Results")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        manager.llm = Mock()
+        manager.llm.stream_complete.side_effect = lambda prompt: iter([
+            Mock(delta="SELECT first_name, email, account_balance FROM customers WHERE id = 1;")
+        ])
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        result = tools['database_query_tool'].fn("What is the first customer's email?")
+        
+        assert "  first_name: ****" in result
+        assert "  email: ***@" in result
+        assert "  account_balance: 50000.0" in result, "Non-PII columns must be left untouched"
+        assert "[PII Protection Applied]" in result
+        print("✅ PII columns masked before formatting")
+    
+    def test_market_data_retries_transient_errors(self, monkeypatch):
+        """Test 15: Transient Yahoo Finance errors are retried before failing"""
+        print("\n" + "="*60)
+        print("TEST 15: Market Data Retries")
+        print("="*60)
+        
+        import asyncio
+        import httpx
+        import function_tools
+        
+        monkeypatch.setattr(function_tools, '_YF_BACKOFF_FACTOR', 0)
+        statuses = iter([503, 429, 200])
+        
+        def handler(request):
+            status = next(statuses)
+            if status != 200:
+                return httpx.Response(status)
+            return httpx.Response(200, json={'chart': {'result': [{'meta': {'regularMarketPrice': 110.0, 'previousClose': 100.0}}]}})
+        
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await function_tools._fetch_stock_data(client, 'AAPL', asyncio.Semaphore(1))
+        
+        data = asyncio.run(fetch())
+        
+        assert data['success'], f"Expected success after retries, got {data}"
+        assert data['current_price'] == 110.0
+        print("✅ 503 and 429 responses retried")
+    
+    def test_market_data_deadline(self, monkeypatch):
+        """Test 15b: Market lookups that miss the overall deadline report a timeout"""
+        print("\n" + "="*60)
+        print("TEST 15b: Market Data Deadline")
+        print("="*60)
+        
+        import asyncio
+        import time
+        import function_tools
+        
+        cancelled = []
+        
+        async def slow_fetch(client, symbol, semaphore):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(symbol)
+                raise
+        
+        monkeypatch.setattr(function_tools, '_fetch_stock_data', slow_fetch)
+        monkeypatch.setattr(function_tools, '_YF_TOTAL_TIMEOUT', 0.05)
+        function_tools._YF_CACHE.clear()
+        
+        manager = function_tools.FunctionToolsManager(verbose=False)
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        output = tools['finance_market_search_tool'].fn("Tesla price")
+        
+        assert output == "Market data error: no response within 0.05s"
+        time.sleep(0.1)
+        assert cancelled == ['TSLA'], "Timed-out fetch should be cancelled"
+        print("✅ Deadline reported and background fetch cancelled")
+    
+    def test_sql_templates_skip_llm(self):
+        """Test 16: Known question shapes run fixed SQL without calling the LLM"""
+        print("\n" + "="*60)
+        print("TEST 16: SQL Templates")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        
+        manager.llm = Mock()
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        count = tools['database_query_tool'].fn("How many customers do we have?")
+        holdings = tools['database_query_tool'].fn("Show holdings for john smith")
+        
+        assert "customer_count: 10" in count
+        assert "symbol:" in holdings
+        assert "john" not in holdings.lower() and "smith" not in holdings.lower(), "Customer names must not leak"
+        manager.llm.stream_complete.assert_not_called()
+        print("✅ Template questions answered without an LLM call")
+    
+    def test_sql_templates_ignore_determiners(self):
+        """Test 16b: Holdings questions about groups of customers fall back to the LLM"""
+        print("\n" + "="*60)
+        print("TEST 16b: SQL Template Determiners")
+        print("="*60)
+        
+        from unittest.mock import Mock
+        from function_tools import _match_sql_template, FunctionToolsManager
+        for question in (
+            "What are the holdings of all customers?",
+            "Show holdings for each customer",
+            "list holdings for our clients",
+        ):
+            assert _match_sql_template(question) is None, question
+        
+        # A template that matches but returns no rows is handed to the LLM
+        manager = FunctionToolsManager(verbose=False)
+        manager.llm = Mock()
+        manager.llm.stream_complete.return_value = [
+            Mock(delta="SELECT COUNT(*) AS holding_count FROM portfolio_holdings;")
+        ]
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        result = tools['database_query_tool'].fn("Show holdings for many clients")
+        
+        manager.llm.stream_complete.assert_called_once()
+        assert "holding_count:" in result
+        print("✅ Determiners skip the holdings template")
+    
+    def test_generic_pii_fields_fully_masked(self):
+        """Test 17: PII fields without a specific masker are fully masked"""
+        print("\n" + "="*60)
+        print("TEST 17: Generic PII Masking")
+        print("="*60)
+        
+        from function_tools import FunctionToolsManager
+        manager = FunctionToolsManager(verbose=False)
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        results = (
+            "Row 1:\n"
+            "  mobile: (555) 123-4567\n"
+            "  tax_id: 123-45-6789\n"
+        )
+        protected = tools['pii_protection_tool'].fn(results, '["mobile", "tax_id"]')
+        
+        assert "  mobile: ****" in protected
+        assert "  tax_id: ****" in protected
+        assert "4567" not in protected and "6789" not in protected
+        print("✅ Generic PII fields fully masked")
+    
+    def test_async_tool_variants(self, monkeypatch):
+        """Test 18: Database and market tools can be awaited concurrently"""
+        print("\n" + "="*60)
+        print("TEST 18: Async Tool Variants")
+        print("="*60)
+        
+        import asyncio
+        import function_tools
+        
+        async def fake_fetch(client, symbol, semaphore):
+            return {'success': False, 'error': 'API request failed'}
+        
+        monkeypatch.setattr(function_tools, '_fetch_stock_data', fake_fetch)
+        function_tools._YF_CACHE.clear()
+        
+        manager = function_tools.FunctionToolsManager(verbose=False)
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        
+        async def run_both():
+            return await asyncio.gather(
+                tools['database_query_tool'].acall("How many customers are there?"),
+                tools['finance_market_search_tool'].acall("Tesla price")
+            )
+        
+        db_output, market_output = asyncio.run(run_both())
+        
+        assert "customer_count: 10" in str(db_output)
+        assert "TSLA: Error - API request failed" in str(market_output)
+        print("✅ Async tool variants awaited together")
 
 if __name__ == "__main__":
     # Run tests individually for better feedback